@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from text_normalization import get_salient_terms, normalize_question
+
+
+class AnswerCache:
+    """Two-tier cache of workflow results scoped by index version.
+
+    Exact hits match the normalized question; semantic hits reuse the answer of the most similar
+    cached question when its cosine similarity reaches similarity_threshold and both questions
+    mention the same numbers, months and BHC variables (ETP vs ETR, janeiro vs julho).
+    """
+
+    def __init__(self, embedding_function=None, max_entries: int = 512, ttl_seconds: float = 86400,
+                 similarity_threshold: float = 0.95):
+        self.embedding_function = embedding_function
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, index_version: str, question: str) -> Tuple[Optional[Dict[str, Any]], Optional[List[float]]]:
+        """Returns (cached_result, question_embedding); the embedding is reused when storing a miss."""
+        key = (index_version, normalize_question(question))
+
+        with self._lock:
+            self._evict_expired()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                print(f"Answer cache: exact hit for '{question}'")
+                return self._as_cached_result(entry, "exact"), entry["embedding"]
+
+        if self.embedding_function is None:
+            with self._lock:
+                self.misses += 1
+            return None, None
+
+        question_embedding = self.embedding_function.embed_query(question)
+        query_vector = np.asarray(question_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query_vector)
+
+        salient_terms = get_salient_terms(key[1])
+        with self._lock:
+            best_key, best_similarity = None, -1.0
+            for entry_key, entry in self._entries.items():
+                if entry_key[0] != index_version or entry["embedding"] is None:
+                    continue
+                if get_salient_terms(entry_key[1]) != salient_terms:
+                    continue
+                entry_vector = np.asarray(entry["embedding"], dtype=np.float32)
+                denominator = query_norm * np.linalg.norm(entry_vector)
+                if denominator == 0:
+                    continue
+                similarity = float(np.dot(query_vector, entry_vector) / denominator)
+                if similarity > best_similarity:
+                    best_key, best_similarity = entry_key, similarity
+
+            if best_key is not None and best_similarity >= self.similarity_threshold:
+                self._entries.move_to_end(best_key)
+                self.semantic_hits += 1
+                print(f"Answer cache: semantic hit for '{question}' (similarity {best_similarity:.3f})")
+                return self._as_cached_result(self._entries[best_key], "semantic"), question_embedding
+
+            self.misses += 1
+        return None, question_embedding
+
+    def put(self, index_version: str, question: str, result: Dict[str, Any],
+            question_embedding: Optional[List[float]] = None):
+        key = (index_version, normalize_question(question))
+        with self._lock:
+            self._entries[key] = {
+                "result": dict(result),
+                "embedding": question_embedding,
+                "created_at": time.time(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, index_version: Optional[str] = None):
+        with self._lock:
+            for key in list(self._entries):
+                if index_version is None or key[0] == index_version:
+                    del self._entries[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "exact_hits": self.exact_hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+            }
+
+    def _evict_expired(self):
+        now = time.time()
+        for key in [key for key, entry in self._entries.items() if now - entry["created_at"] > self.ttl_seconds]:
+            del self._entries[key]
+
+    def _as_cached_result(self, entry, cache_tier):
+        result = dict(entry["result"])
+        result["answer_cache_hit"] = cache_tier
+        return result
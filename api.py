@@ -0,0 +1,176 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from config import (
+    API_HOST, API_PORT, API_WORKERS, LOCAL_DOCUMENT_PATH, STREAMING_INGESTION, CORPUS_MODE, CHROMA_SERVER_HOST
+)
+from document_indexer import DocumentIndexer, build_metadata_filter
+from document_loader import StreamlitMultiFormatDocumentLoader
+from index_manifest import hash_bytes, hash_file, get_local_source_key, get_upload_source_key
+from rag_workflow import RAGWorkflow
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        source_key, index_version = await asyncio.to_thread(index_local_document)
+        print(f"Local document index ready: {source_key} ({index_version})")
+    except Exception as e:
+        print(f"Could not prepare local document index: {e}")
+    yield
+
+
+app = FastAPI(title="Geomimi RAG API", lifespan=lifespan)
+
+document_loader = StreamlitMultiFormatDocumentLoader()
+document_indexer = DocumentIndexer()
+
+# Local Chroma clients cache open collections per process, so with several workers and no shared Chroma server
+# an ingest in one worker would leave the others querying stale vectors: serve read-only instead
+INGESTION_ENABLED = API_WORKERS <= 1 or bool(CHROMA_SERVER_HOST)
+
+
+class AskRequest(BaseModel):
+    question: str
+    source: Optional[str] = None
+    file_names: Optional[List[str]] = None
+    file_types: Optional[List[str]] = None
+    pages: Optional[List[int]] = None
+
+
+@dataclass
+class UploadedBytes:
+    """Minimal stand-in for a Streamlit UploadedFile so uploads reuse the same loader path."""
+    name: str
+    data: bytes
+    type: str = "application/octet-stream"
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    def getvalue(self):
+        return self.data
+
+
+def serialize_value(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if hasattr(value, "page_content"):
+        return {"page_content": value.page_content, "metadata": value.metadata}
+    if isinstance(value, dict):
+        return {key: serialize_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [serialize_value(item) for item in value]
+    return value
+
+
+def index_local_document():
+    source_key = get_local_source_key(LOCAL_DOCUMENT_PATH)
+    content_hash = hash_file(LOCAL_DOCUMENT_PATH)
+    retriever, index_version = document_indexer.open_index(source_key, content_hash)
+    if retriever is None and STREAMING_INGESTION:
+        retriever, index_version = document_indexer.build_index_streaming(
+            source_key, content_hash, document_loader.lazy_load_document(LOCAL_DOCUMENT_PATH)
+        )
+    elif retriever is None:
+        documents = document_loader.load_document(LOCAL_DOCUMENT_PATH)
+        retriever, index_version = document_indexer.build_index(source_key, content_hash, documents)
+    return source_key, index_version
+
+
+def create_workflow(request: AskRequest):
+    if CORPUS_MODE and request.source is None:
+        retriever, index_version = document_indexer.open_corpus(
+            build_metadata_filter(request.file_names, request.file_types, request.pages)
+        )
+        if retriever is None:
+            raise HTTPException(status_code=404, detail="The corpus has no indexed documents")
+    else:
+        source_key = request.source or get_local_source_key(LOCAL_DOCUMENT_PATH)
+        retriever, index_version = document_indexer.open_index(source_key)
+        if retriever is None:
+            raise HTTPException(status_code=404, detail=f"No index found for source '{source_key}'")
+
+    workflow = RAGWorkflow()
+    workflow.set_retriever(retriever, index_version)
+    return workflow
+
+
+@app.post("/ask")
+async def ask(request: AskRequest):
+    workflow = await asyncio.to_thread(create_workflow, request)
+    result = await workflow.aprocess_question(request.question)
+    return serialize_value(result)
+
+
+@app.post("/ask/stream")
+async def ask_stream(request: AskRequest):
+    workflow = await asyncio.to_thread(create_workflow, request)
+
+    async def event_lines():
+        async for event_type, payload in workflow.astream_question(request.question):
+            if event_type == "token":
+                event = {"event": "token", "content": payload}
+            elif event_type == "node":
+                node_name, update = payload
+                event = {"event": "node", "node": node_name, "update": serialize_value(update)}
+            else:
+                event = {"event": "result", "result": serialize_value(payload)}
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
+
+@app.post("/ingest")
+async def ingest(request: Request, filename: str = Query(..., description="Original file name, used to pick the loader")):
+    if not INGESTION_ENABLED:
+        raise HTTPException(
+            status_code=409,
+            detail="Ingestion is disabled with multiple API workers and no shared Chroma server (set GEOMIMI_CHROMA_HOST)"
+        )
+    if not document_loader.is_supported_file(filename):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported file type. Supported formats: {document_loader.get_supported_extensions_display()}"
+        )
+
+    upload = UploadedBytes(name=filename, data=await request.body(), type=request.headers.get("content-type", "unknown"))
+    if not upload.data:
+        raise HTTPException(status_code=400, detail="Empty request body")
+
+    source_key = get_upload_source_key(upload.name)
+    buffer = memoryview(upload.data)
+    content_hash = hash_bytes(buffer)
+
+    def build():
+        retriever, index_version = document_indexer.open_index(source_key, content_hash)
+        if retriever is not None:
+            return index_version, True
+        if STREAMING_INGESTION:
+            _, index_version = document_indexer.build_index_streaming(
+                source_key, content_hash, document_loader.lazy_load_uploaded_file(upload, buffer)
+            )
+            return index_version, False
+        documents = document_loader.load_uploaded_file(upload, buffer)
+        _, index_version = document_indexer.build_index(source_key, content_hash, documents)
+        return index_version, False
+
+    try:
+        index_version, reused = await asyncio.to_thread(build)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Failed to ingest {filename}: {str(e)}")
+
+    return {"source": source_key, "index_version": index_version, "reused_existing_index": reused}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run("api:app", host=API_HOST, port=API_PORT, workers=API_WORKERS)
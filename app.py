@@ -1,27 +1,31 @@
 import streamlit as st
 
-from utils import clear_chroma_db, initialize_session_state
+from config import STREAM_ANSWERS, LOCAL_DOCUMENT_PATH, CORPUS_MODE, CORPUS_DIRECTORY
+from utils import initialize_session_state
 from ui_components import (
     setup_page_config, render_header, render_upload_placeholder,
-    render_question_section, render_answer_section,
+    render_question_section, render_answer_section, render_streaming_answer_section, render_corpus_filters,
 )
 from document_loader import MultiModalDocumentLoader
 from document_processor import DocumentProcessor
-from rag_workflow import RAGWorkflow
+from streamlit_rag_workflow import StreamlitRAGWorkflow
 
 document_loader = MultiModalDocumentLoader()
 document_processor = DocumentProcessor(document_loader)
-rag_workflow = RAGWorkflow()
+rag_workflow = StreamlitRAGWorkflow()
 
 
 def handle_question_processing(question):
     print(f"Processing question: {question}")
     
     with st.container():
-        with st.spinner('🧠 Analisando sua pergunta e recuperando informações relevantes...'):
-            result = rag_workflow.process_question(question)
-        
-        render_answer_section(result)
+        if STREAM_ANSWERS:
+            result = render_streaming_answer_section(rag_workflow.stream_question(question))
+        else:
+            with st.spinner('🧠 Analisando sua pergunta e recuperando informações relevantes...'):
+                result = rag_workflow.process_question(question)
+            
+            render_answer_section(result)
         
         if result:
             st.markdown("---")
@@ -100,10 +104,12 @@ def handle_question_processing(question):
                         else:
                             row.append("N/A")
                         
+                        row.append(getattr(eval, 'grading_decision', 'llm'))
+                        
                         eval_data.append(row)
                     
                     if eval_data:
-                        eval_df = pd.DataFrame(eval_data, columns=["Documento", "Pontuação", "Relevância", "Cobertura", "Informação Ausente"])
+                        eval_df = pd.DataFrame(eval_data, columns=["Documento", "Pontuação", "Relevância", "Cobertura", "Informação Ausente", "Decisão"])
                         st.dataframe(eval_df, use_container_width=True)
                 
                 # Tabela de raciocínio
@@ -129,18 +135,37 @@ def handle_user_interaction(user_file):
         st.warning("Por favor, digite uma pergunta antes de clicar em Perguntar.")
 
 
+def handle_corpus_mode():
+    if not st.session_state.get('corpus_indexed', False):
+        with st.spinner('🔄 Indexando corpus de documentos...'):
+            indexed_count = document_processor.process_corpus_directory(CORPUS_DIRECTORY)
+        st.session_state.corpus_indexed = True
+        print(f"Corpus indexed: {indexed_count} files from {CORPUS_DIRECTORY}")
+    
+    corpus_files = document_processor.indexer.get_corpus_files()
+    file_names, file_types = render_corpus_filters(corpus_files)
+    st.session_state.corpus_scope = ", ".join(file_names + file_types) or "todos os documentos"
+    
+    if document_processor.open_corpus_retriever(file_names, file_types) is None:
+        st.error(f"❌ Nenhum documento indexado em {CORPUS_DIRECTORY}")
+        render_upload_placeholder()
+        return
+    
+    st.success(f"✅ Corpus carregado: {len(corpus_files)} documentos")
+    handle_user_interaction("corpus")
+
+
 def main():
     initialize_session_state()
     
-    if 'db_cleared' not in st.session_state:
-        clear_chroma_db()
-        st.session_state.db_cleared = True
-        print("ChromaDB cleared on app startup")
-    
     setup_page_config()
     render_header()
     
-    local_pdf_path = "local_data/geografo_proposta.pdf"
+    if CORPUS_MODE:
+        handle_corpus_mode()
+        return
+    
+    local_pdf_path = LOCAL_DOCUMENT_PATH
 
     st.markdown("""
             Documento: **“Proposta de Desenvolvimento de um Geografo Inteligente - Especializado em Calculo Hidrico”**  \n
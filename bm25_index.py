@@ -0,0 +1,184 @@
+import math
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_FILTER_FIELDS = ("source_key", "file_name", "file_type", "page")
+
+# Accent-stripped Portuguese function words: they occur in nearly every chunk, so they only add postings to walk.
+# "mais"/"menos" stay indexed because they carry meaning in BHC terms ("P menos ETP").
+_STOPWORDS = frozenset("""
+a o as os um uma uns umas de do da dos das em no na nos nas num numa por pelo pela pelos pelas para com sem
+sob sobre entre ate apos desde e ou mas nem que se ao aos como ja nao foi ser sao era eram esta estao este
+estes estas esse essa esses essas isso isto aquele aquela aquilo seu sua seus suas lhe ele ela eles elas
+qual quais quando onde ha tem muito tambem
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    normalized = unicodedata.normalize("NFKD", text.casefold())
+    normalized = "".join(char for char in normalized if not unicodedata.combining(char))
+    return [token for token in _TOKEN_PATTERN.findall(normalized) if token not in _STOPWORDS]
+
+
+def build_filter_sql(where: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+    """Translates the subset of Chroma `where` syntax produced by build_metadata_filter ($and, $in, equality)."""
+    if not where:
+        return "1", []
+
+    clauses, params = [], []
+    for field, condition in where.items():
+        if field == "$and":
+            for sub_condition in condition:
+                clause, sub_params = build_filter_sql(sub_condition)
+                clauses.append(f"({clause})")
+                params.extend(sub_params)
+            continue
+        if field not in _FILTER_FIELDS:
+            raise ValueError(f"Unsupported BM25 filter field: {field}")
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        if "$in" in condition:
+            values = list(condition["$in"])
+            clauses.append(f"chunks.{field} IN ({','.join('?' * len(values))})" if values else "0")
+            params.extend(values)
+        if "$eq" in condition:
+            clauses.append(f"chunks.{field} = ?")
+            params.append(condition["$eq"])
+    return " AND ".join(clauses) or "1", params
+
+
+class BM25Index:
+    """Inverted index with Okapi BM25 scoring, updated chunk by chunk alongside a Chroma collection.
+
+    Postings, lengths and the metadata needed for filtering live in SQLite; chunk texts stay in Chroma.
+    Writes only touch the rows of the changed chunks and every search reads the committed state, so
+    other processes see new chunks as soon as save() commits, without re-reading the whole index.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+
+        index_dir = os.path.dirname(path)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        # WAL lets workers keep searching while the indexing process holds its write transaction
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS chunks (
+                id INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL UNIQUE,
+                length INTEGER NOT NULL,
+                source_key TEXT,
+                file_name TEXT,
+                file_type TEXT,
+                page INTEGER
+            )"""
+        )
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                chunk INTEGER NOT NULL,
+                frequency INTEGER NOT NULL,
+                PRIMARY KEY (term, chunk)
+            ) WITHOUT ROWID"""
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_postings_chunk ON postings (chunk)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_chunks_source_key ON chunks (source_key)")
+        self._connection.commit()
+
+    @classmethod
+    def load(cls, path: str, k1: float = 1.5, b: float = 0.75) -> Optional["BM25Index"]:
+        """Opens a persisted index; None when it is missing, unreadable or empty, so the caller rebuilds it."""
+        if not os.path.exists(path):
+            return None
+        try:
+            index = cls(path, k1=k1, b=b)
+            return index if len(index) else None
+        except sqlite3.Error as e:
+            print(f"Could not read BM25 index {path}: {e}")
+            return None
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def add(self, chunk_id: str, text: str, metadata: Optional[Dict[str, Any]] = None):
+        term_counts = Counter(tokenize(text))
+        metadata = metadata or {}
+        with self._lock:
+            self.remove(chunk_id)
+            cursor = self._connection.execute(
+                "INSERT INTO chunks (chunk_id, length, source_key, file_name, file_type, page) VALUES (?, ?, ?, ?, ?, ?)",
+                [chunk_id, sum(term_counts.values()), *(metadata.get(field) for field in _FILTER_FIELDS)]
+            )
+            self._connection.executemany(
+                "INSERT INTO postings (term, chunk, frequency) VALUES (?, ?, ?)",
+                [(term, cursor.lastrowid, count) for term, count in term_counts.items()]
+            )
+
+    def update_metadata(self, chunk_id: str, metadata: Dict[str, Any]):
+        with self._lock:
+            self._connection.execute(
+                "UPDATE chunks SET source_key = ?, file_name = ?, file_type = ?, page = ? WHERE chunk_id = ?",
+                [*(metadata.get(field) for field in _FILTER_FIELDS), chunk_id]
+            )
+
+    def remove(self, chunk_id: str):
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM postings WHERE chunk IN (SELECT id FROM chunks WHERE chunk_id = ?)", (chunk_id,)
+            )
+            self._connection.execute("DELETE FROM chunks WHERE chunk_id = ?", (chunk_id,))
+
+    def search(self, query: str, k: int, where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        filter_sql, filter_params = build_filter_sql(where)
+
+        with self._lock:
+            document_count, average_length = self._connection.execute(
+                "SELECT COUNT(*), AVG(length) FROM chunks"
+            ).fetchone()
+            if not document_count:
+                return []
+
+            document_frequencies = self._connection.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE term IN ({','.join('?' * len(terms))}) GROUP BY term",
+                terms
+            ).fetchall()
+            if not document_frequencies:
+                return []
+
+            # IDF uses the whole collection; the filter only narrows which chunks are scored
+            query_terms = []
+            for term, frequency in document_frequencies:
+                query_terms.extend([term, math.log(1 + (document_count - frequency + 0.5) / (frequency + 0.5))])
+            return self._connection.execute(
+                f"""WITH query_terms (term, idf) AS (VALUES {','.join(['(?, ?)'] * len(document_frequencies))}),
+                candidates AS (SELECT id, chunk_id, length FROM chunks WHERE {filter_sql})
+                SELECT candidates.chunk_id,
+                       SUM(query_terms.idf * postings.frequency * (? + 1)
+                           / (postings.frequency + ? * (1 - ? + ? * candidates.length / ?))) AS score
+                FROM query_terms
+                JOIN postings ON postings.term = query_terms.term
+                JOIN candidates ON candidates.id = postings.chunk
+                GROUP BY candidates.id
+                ORDER BY score DESC, candidates.chunk_id
+                LIMIT ?""",
+                [*query_terms, *filter_params, self.k1, self.k1, self.b, self.b, float(average_length), k]
+            ).fetchall()
+
+    def save(self):
+        with self._lock:
+            self._connection.commit()
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
@@ -89,4 +91,59 @@ Provide your comprehensive evaluation based on the framework above."""),
     ]
 )
 
-evaluate_docs = evaluate_prompt | structured_output
\ No newline at end of file
+evaluate_docs = evaluate_prompt | structured_output
+
+class IndexedEvaluateDocs(EvaluateDocs):
+
+    document_index: int = Field(
+        description="Zero-based index of the evaluated document in the retrieved documents list"
+    )
+
+
+class GatedEvaluateDocs(EvaluateDocs):
+    """Evaluation recorded by the similarity gate; not an LLM output schema."""
+
+    grading_decision: str = Field(default="llm", description="'auto_accept', 'auto_reject' or 'llm'")
+    similarity: Optional[float] = Field(default=None, description="Reranker similarity that drove the gate")
+    accept_threshold: Optional[float] = None
+    reject_threshold: Optional[float] = None
+
+
+class ListwiseEvaluateDocs(BaseModel):
+
+    evaluations: List[IndexedEvaluateDocs] = Field(
+        description="One evaluation per retrieved document, in the same order as the documents were given"
+    )
+
+
+def format_documents_for_listwise(documents) -> str:
+    return "\n\n".join(
+        f"[DOCUMENT {index}]\n{document.page_content}" for index, document in enumerate(documents)
+    )
+
+
+listwise_structured_output = llm.with_structured_output(ListwiseEvaluateDocs)
+
+listwise_evaluate_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", system),
+        ("human", """Please evaluate each of the retrieved documents below independently against the user's query.
+
+USER QUERY:
+{question}
+
+RETRIEVED DOCUMENTS ({document_count} in total, each tagged with its index):
+{documents}
+
+EVALUATION REQUIRED FOR EACH DOCUMENT:
+1. Document Index: the index shown in the document tag
+2. Primary Score: 'yes' if the document is sufficient, 'no' if insufficient
+3. Relevance Score: 0.0-1.0 rating of how well the document matches the query
+4. Coverage Assessment: How well does the document address the query requirements?
+5. Missing Information: What key information (if any) is missing for a complete answer?
+
+Return exactly one evaluation per document, ordered by document index."""),
+    ]
+)
+
+listwise_evaluate_docs = listwise_evaluate_prompt | listwise_structured_output
\ No newline at end of file
@@ -1,3 +1,5 @@
+from typing import List
+
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 from langchain_openai import ChatOpenAI
@@ -88,4 +90,50 @@ Forneça sua avaliação detalhada com base nos critérios acima."""),
     ]
 )
 
-evaluate_docs = evaluate_prompt | structured_output
\ No newline at end of file
+evaluate_docs = evaluate_prompt | structured_output
+
+class IndexedEvaluateDocs(EvaluateDocs):
+
+    document_index: int = Field(
+        description="Zero-based index of the evaluated document in the retrieved documents list"
+    )
+
+
+class ListwiseEvaluateDocs(BaseModel):
+
+    evaluations: List[IndexedEvaluateDocs] = Field(
+        description="One evaluation per retrieved document, in the same order as the documents were given"
+    )
+
+
+def format_documents_for_listwise(documents) -> str:
+    return "\n\n".join(
+        f"[DOCUMENTO {index}]\n{document.page_content}" for index, document in enumerate(documents)
+    )
+
+
+listwise_structured_output = llm.with_structured_output(ListwiseEvaluateDocs)
+
+listwise_evaluate_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", system),
+        ("human", """Avalie cada um dos documentos recuperados abaixo, de forma independente, em relação à pergunta do usuário.
+
+PERGUNTA DO USUÁRIO:
+{question}
+
+DOCUMENTOS RECUPERADOS ({document_count} no total, cada um marcado com seu índice):
+{documents}
+
+AVALIAÇÃO REQUERIDA PARA CADA DOCUMENTO:
+1. Índice do Documento: o índice mostrado na marcação do documento
+2. Pontuação Principal: 'sim' se o documento é suficiente, 'não' se insuficiente
+3. Pontuação de Relevância: nota de 0.0 a 1.0 sobre o quanto o documento corresponde à pergunta
+4. Avaliação de Cobertura: como o documento atende aos requisitos da pergunta?
+5. Informação Ausente: qual informação chave (se houver) está faltando para uma resposta completa?
+
+Retorne exatamente uma avaliação por documento, ordenada pelo índice do documento."""),
+    ]
+)
+
+listwise_evaluate_docs = listwise_evaluate_prompt | listwise_structured_output
\ No newline at end of file
@@ -8,14 +8,88 @@ PAGE_ICON = "🌎"
 LAYOUT = "wide"
 SIDEBAR_STATE = "expanded"
 
+LOCAL_DOCUMENT_PATH = "local_data/geografo_proposta.pdf"
+CORPUS_MODE = False
+CORPUS_DIRECTORY = "local_data"
+
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 100
+CHUNK_TOKEN_ENCODING = "cl100k_base"
+CHUNKING_MODE = "structure_aware"  # "structure_aware" or "token"
+TABLE_MIN_ROWS = 3
+EQUATION_MIN_LINES = 2  # single formula lines stay inside their paragraph
+EQUATION_MAX_WORD_RATIO = 0.25  # lines with more prose words than this are sentences, not formulas
+CHUNKING_MAX_WORKERS = os.cpu_count() or 1
+CHUNKING_PARALLEL_MIN_DOCUMENTS = 16
 CHROMA_COLLECTION_NAME = "rag-chroma"
+CORPUS_COLLECTION_NAME = f"{CHROMA_COLLECTION_NAME}-corpus"
 CHROMA_PERSIST_DIR = "./.chroma"
+CHROMA_MANIFEST_FILE = "index_manifest.json"
+# A Chroma server shared by every process; needed for ingestion with more than one API worker, since a local
+# persistent client never sees vectors written by another process into a collection it already has open
+CHROMA_SERVER_HOST = os.getenv("GEOMIMI_CHROMA_HOST")
+CHROMA_SERVER_PORT = int(os.getenv("GEOMIMI_CHROMA_PORT", "8001"))
+EMBEDDING_PROVIDER = os.getenv("GEOMIMI_EMBEDDING_PROVIDER", "openai")  # "openai", "onnx" or "sentence_transformers"
+OPENAI_EMBEDDING_MODEL = "text-embedding-ada-002"
+LOCAL_EMBEDDING_MODEL = "all-MiniLM-L6-v2"  # the "onnx" provider always runs all-MiniLM-L6-v2
+LOCAL_EMBEDDING_BATCH_SIZE = 32
+LOCAL_EMBEDDING_THREADS = os.cpu_count() or 1
+# Scopes the embedding cache, index versions and manifests to the active provider
+EMBEDDING_MODEL = OPENAI_EMBEDDING_MODEL if EMBEDDING_PROVIDER == "openai" else f"{EMBEDDING_PROVIDER}:{LOCAL_EMBEDDING_MODEL}"
+EMBEDDING_CACHE_PATH = os.path.join(CHROMA_PERSIST_DIR, "embedding_cache.sqlite")
+EMBEDDING_CACHE_MAX_ENTRIES = 100_000
+QUERY_EMBEDDING_CACHE_MAX_ENTRIES = 1024
 
 LLM_TEMPERATURE = 0
+GRADING_MAX_CONCURRENCY = 4
+GRADING_MODE = "per_document"  # "per_document" or "listwise"
+VALIDATION_MODE = "parallel"  # "parallel" or "sequential"
+STREAM_ANSWERS = True
+
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_MAX_ENTRIES = 512
+ANSWER_CACHE_TTL_SECONDS = 24 * 60 * 60
+ANSWER_CACHE_SIMILARITY_THRESHOLD = 0.95
+RETRIEVAL_CACHE_ENABLED = True
+RETRIEVAL_CACHE_MAX_ENTRIES = 256
 TAVILY_SEARCH_RESULTS = 2
 
+RETRIEVER_MODE = "hybrid"  # "hybrid" (BM25 + vector, RRF) or "vector"
+RETRIEVER_K = 4
+RETRIEVER_SEARCH_TYPE = "similarity"  # "similarity", "mmr" or "similarity_score_threshold"
+RETRIEVER_SCORE_THRESHOLD = 0.5  # used by "similarity_score_threshold"
+MMR_LAMBDA_MULT = 0.5  # 1 = pure relevance, 0 = maximum diversity
+ADAPTIVE_K = True  # drop chunks scoring below ADAPTIVE_K_SCORE_RATIO * best score
+ADAPTIVE_K_SCORE_RATIO = 0.75
+ADAPTIVE_K_MIN = 1
+HYBRID_FETCH_K = 20
+RRF_K = 60
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+RERANK_ENABLED = True  # retrieve RERANK_FETCH_K candidates and only send the RERANK_TOP_N best to the LLM grader
+RERANKER = "embedding"  # "embedding" (cosine with cached chunk vectors) or "cross_encoder"
+RERANK_CROSS_ENCODER_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+RERANK_FETCH_K = 12
+RERANK_TOP_N = 4
+# Chunks whose rerank score is >= accept are kept and < reject are dropped without an LLM call; only the band
+# in between is graded. Score ranges differ per scorer, so bands are keyed by reranker.get_scorer_name() and
+# produced by python -m evaluation.grading_calibration. Scorers without an entry grade every chunk with the LLM.
+GRADING_GATE_ENABLED = True
+GRADING_GATE_THRESHOLDS = {}  # {scorer_name: {"reject": float, "accept": float}}
+
+STREAMING_INGESTION = True
+INGEST_BATCH_SIZE = 256
+
+EMBEDDING_BATCH_MAX_TOKENS = 16_000
+EMBEDDING_MAX_CONCURRENCY = 4
+EMBEDDING_MAX_RETRIES = 6
+EMBEDDING_BACKOFF_BASE_SECONDS = 1.0
+EMBEDDING_BACKOFF_MAX_SECONDS = 60.0
+
+LOADER_MAX_WORKERS = os.cpu_count() or 1
+LOADER_FILE_TIMEOUT_SECONDS = 300
+
 SUPPORTED_EXTENSIONS = [
     "pdf", "docx", "doc", "csv", "xlsx", "xls", 
     "txt", "md", "py", "js", "html", "xml"
@@ -30,3 +104,7 @@ FILE_CATEGORIES = {
     "📊 Data Files": ["Excel (.xlsx, .xls)", "CSV (.csv)"],
     "💻 Code Files": ["Python (.py)", "JavaScript (.js)", "HTML (.html)", "XML (.xml)"]
 }
+
+API_HOST = os.getenv("GEOMIMI_API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("GEOMIMI_API_PORT", "8000"))
+API_WORKERS = int(os.getenv("GEOMIMI_API_WORKERS", "1"))
@@ -0,0 +1,230 @@
+import multiprocessing
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Iterable, Iterator, List
+
+import tiktoken
+from langchain.text_splitter import CharacterTextSplitter
+from langchain_core.documents import Document
+
+from config import (
+    CHUNK_SIZE, CHUNK_OVERLAP, CHUNK_TOKEN_ENCODING, CHUNKING_MODE, TABLE_MIN_ROWS, EQUATION_MIN_LINES,
+    EQUATION_MAX_WORD_RATIO, CHUNKING_MAX_WORKERS, CHUNKING_PARALLEL_MIN_DOCUMENTS
+)
+from text_normalization import BHC_COLUMNS, MONTHS
+
+
+_NUMBER_PATTERN = re.compile(r"^[-+−–]?\(?\d+(?:[.,]\d+)*\)?%?$")
+_MATH_SYMBOLS_PATTERN = re.compile(r"[=≈≤≥∑Σ√×÷^]|\b(?:log|ln|exp)\b")
+_WORD_PATTERN = re.compile(r"^[^\W\d_]{3,}$")
+_MATH_FUNCTIONS = {"log", "ln", "exp"}
+
+_chunking_pool = None
+_chunking_pool_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_token_encoder(encoding_name: str = CHUNK_TOKEN_ENCODING):
+    return tiktoken.get_encoding(encoding_name)
+
+
+def count_tokens(text: str) -> int:
+    return len(get_token_encoder().encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=None)
+def get_text_splitter() -> CharacterTextSplitter:
+    return CharacterTextSplitter(
+        chunk_size=CHUNK_SIZE,
+        chunk_overlap=CHUNK_OVERLAP,
+        length_function=count_tokens,
+        add_start_index=True
+    )
+
+
+def split_document(document: Document) -> List[Document]:
+    """Splits a single page/row, keeping its metadata (page, source, ...) plus the chunk's character span."""
+    if CHUNKING_MODE == "structure_aware":
+        return split_document_by_structure(document)
+    return _split_prose(document)
+
+
+def split_documents_in_order(documents: Iterable[Document], parallel: bool = True) -> Iterator[List[Document]]:
+    """Yields split_document(document) for every input, in input order.
+
+    With parallel=True inputs of at least CHUNKING_PARALLEL_MIN_DOCUMENTS pages (the first ones are buffered to
+    decide) are fanned out to a shared process pool through a sliding window of 2 * CHUNKING_MAX_WORKERS pending
+    pages, so lazily loaded inputs are never fully materialised; smaller inputs are split in-process.
+    """
+    documents = iter(documents)
+    head = list(islice(documents, CHUNKING_PARALLEL_MIN_DOCUMENTS)) if parallel else []
+    if not parallel or CHUNKING_MAX_WORKERS <= 1 or len(head) < CHUNKING_PARALLEL_MIN_DOCUMENTS:
+        for document in chain(head, documents):
+            yield split_document(document)
+        return
+    
+    pool = _get_chunking_pool()
+    pending = deque()
+    for document in chain(head, documents):
+        pending.append(pool.submit(split_document, document))
+        if len(pending) >= 2 * CHUNKING_MAX_WORKERS:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def split_documents(documents: List[Document]) -> List[Document]:
+    return [chunk for chunks in split_documents_in_order(documents) for chunk in chunks]
+
+
+def _get_chunking_pool() -> ProcessPoolExecutor:
+    global _chunking_pool
+    with _chunking_pool_lock:
+        if _chunking_pool is None:
+            _chunking_pool = ProcessPoolExecutor(
+                max_workers=CHUNKING_MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _chunking_pool
+
+
+def split_document_by_structure(document: Document) -> List[Document]:
+    """Keeps table and equation blocks as atomic chunks with a summary header; prose goes through the token splitter."""
+    chunks = []
+    for block_type, start_index, text in _find_blocks(document.page_content):
+        if block_type == "text":
+            segment = Document(page_content=text, metadata=dict(document.metadata))
+            for chunk in _split_prose(segment):
+                if chunk.metadata.get("start_index", -1) >= 0:
+                    chunk.metadata["start_index"] += start_index
+                    chunk.metadata["end_index"] += start_index
+                chunks.append(chunk)
+        else:
+            chunks.extend(_build_atomic_chunks(document, block_type, start_index, text))
+    return chunks
+
+
+def _split_prose(document: Document) -> List[Document]:
+    chunks = get_text_splitter().split_documents([document])
+    for chunk in chunks:
+        start_index = chunk.metadata.get("start_index", -1)
+        chunk.metadata.update({
+            "end_index": start_index + len(chunk.page_content) if start_index >= 0 else -1,
+            "chunk_size": len(chunk.page_content),
+            "chunk_type": "text"
+        })
+    return chunks
+
+
+def _classify_line(line: str) -> str:
+    tokens = line.split()
+    if not tokens:
+        return "blank"
+    
+    numeric_count = sum(1 for token in tokens if _NUMBER_PATTERN.match(token))
+    if numeric_count >= 3 and numeric_count / len(tokens) >= 0.5:
+        return "table"
+    
+    label_count = sum(1 for token in tokens if token.strip(".,:;()").upper() in BHC_COLUMNS
+                      or token.strip(".,:;()").lower() in MONTHS)
+    if len(tokens) >= 3 and label_count / len(tokens) >= 0.5:
+        return "table"
+    
+    if len(line) <= 160 and _MATH_SYMBOLS_PATTERN.search(line) and _is_symbolic(tokens):
+        return "equation"
+    return "text"
+
+
+def _is_symbolic(tokens: List[str]) -> bool:
+    words = [
+        token for token in (token.strip(".,:;()") for token in tokens)
+        if _WORD_PATTERN.match(token) and token.upper() not in BHC_COLUMNS and token.lower() not in _MATH_FUNCTIONS
+    ]
+    return len(words) / len(tokens) <= EQUATION_MAX_WORD_RATIO
+
+
+def _find_blocks(text: str):
+    """Returns (block_type, start_index, text) spans in page order; short table and equation runs are treated as prose."""
+    runs = []
+    offset = 0
+    for line in text.splitlines(keepends=True):
+        line_type = _classify_line(line)
+        if line_type == "blank" and runs:
+            line_type = runs[-1][0]
+        if runs and runs[-1][0] == line_type:
+            runs[-1][2].append(line)
+        else:
+            runs.append((line_type, offset, [line]))
+        offset += len(line)
+    
+    blocks = []
+    for line_type, start_index, lines in runs:
+        row_count = sum(1 for line in lines if line.strip())
+        if line_type == "table" and row_count < TABLE_MIN_ROWS:
+            line_type = "text"
+        if line_type == "equation" and row_count < EQUATION_MIN_LINES:
+            line_type = "text"
+        if line_type == "blank":
+            line_type = "text"
+        if blocks and blocks[-1][0] == "text" and line_type == "text":
+            blocks[-1] = ("text", blocks[-1][1], blocks[-1][2] + "".join(lines))
+        else:
+            blocks.append((line_type, start_index, "".join(lines)))
+    return [block for block in blocks if block[2].strip()]
+
+
+def _build_atomic_chunks(document: Document, block_type: str, start_index: int, text: str) -> List[Document]:
+    rows = [line for line in text.splitlines() if line.strip()]
+    header_row = rows[0] if block_type == "table" and not _NUMBER_PATTERN.match(rows[0].split()[-1]) else None
+    body_rows = rows[1:] if header_row is not None else rows
+    
+    # Oversized blocks are cut between rows only, repeating the column header in every part
+    row_groups, current_group = [], []
+    for row in body_rows:
+        candidate = "\n".join(([header_row] if header_row else []) + current_group + [row])
+        if current_group and count_tokens(candidate) > CHUNK_SIZE:
+            row_groups.append(current_group)
+            current_group = []
+        current_group.append(row)
+    if current_group:
+        row_groups.append(current_group)
+    
+    chunks = []
+    for part_number, group in enumerate(row_groups, start=1):
+        content = "\n".join(([header_row] if header_row else []) + group)
+        summary = _summarize_block(block_type, rows, header_row, part_number, len(row_groups))
+        chunks.append(Document(
+            page_content=f"{summary}\n{content}",
+            metadata={
+                **document.metadata,
+                "start_index": start_index,
+                "end_index": start_index + len(text),
+                "chunk_size": len(content),
+                "chunk_type": block_type
+            }
+        ))
+    return chunks
+
+
+def _summarize_block(block_type: str, rows: List[str], header_row, part_number: int, part_count: int) -> str:
+    part_label = f" (parte {part_number}/{part_count})" if part_count > 1 else ""
+    if block_type == "equation":
+        defined_terms = [row.split("=")[0].strip() for row in rows if "=" in row and len(row.split("=")[0].strip()) <= 20]
+        if defined_terms:
+            return f"[Equação{part_label}: define {', '.join(defined_terms)}]"
+        return f"[Equação{part_label}]"
+    
+    labels = []
+    for token in " ".join(rows).split():
+        label = token.strip(".,:;()")
+        if (label.upper() in BHC_COLUMNS or label.lower() in MONTHS) and label not in labels:
+            labels.append(label)
+    summary = f"[Tabela{part_label}: {len(rows)} linhas"
+    if header_row:
+        summary += f"; colunas: {', '.join(header_row.split())}"
+    elif labels:
+        summary += f"; rótulos: {', '.join(labels[:12])}"
+    return summary + "]"
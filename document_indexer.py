@@ -0,0 +1,321 @@
+from langchain_chroma import Chroma
+
+from bm25_index import BM25Index
+from config import (
+    CHROMA_PERSIST_DIR, CHROMA_SERVER_HOST, CHROMA_SERVER_PORT, INGEST_BATCH_SIZE, CORPUS_MODE, CORPUS_COLLECTION_NAME,
+    RETRIEVER_MODE, RETRIEVER_K, RETRIEVER_SEARCH_TYPE, RETRIEVER_SCORE_THRESHOLD, MMR_LAMBDA_MULT,
+    ADAPTIVE_K, ADAPTIVE_K_SCORE_RATIO, ADAPTIVE_K_MIN, HYBRID_FETCH_K, RRF_K, BM25_K1, BM25_B,
+    RERANK_ENABLED, RERANK_FETCH_K
+)
+from document_chunker import split_documents, split_documents_in_order
+from embeddings import get_embedding_function, get_embedding_pipeline
+from index_manifest import (
+    build_chunk_id, build_corpus_version, build_index_version, hash_bytes, find_index_entry, get_corpus_entries,
+    get_source_entry, record_index_entry, remove_index_entry, get_bm25_index_path, get_collection_name,
+    index_build_lock
+)
+from resource_registry import get_shared_resource, get_shared_retriever, set_shared_retriever
+from retrievers import HybridRetriever, VectorRetriever
+
+
+def _create_chroma_http_client():
+    import chromadb
+    return chromadb.HttpClient(host=CHROMA_SERVER_HOST, port=CHROMA_SERVER_PORT)
+
+
+def build_metadata_filter(file_names=None, file_types=None, pages=None):
+    """Chroma `where` clause restricting a query to the given file names, types and/or (0-based) pages."""
+    conditions = []
+    if file_names:
+        conditions.append({"file_name": {"$in": list(file_names)}})
+    if file_types:
+        conditions.append({"file_type": {"$in": list(file_types)}})
+    if pages:
+        conditions.append({"page": {"$in": [int(page) for page in pages]}})
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+class DocumentIndexer:
+    
+    def __init__(self):
+        self.embedding_function = get_embedding_function()
+        self.embedding_pipeline = get_embedding_pipeline()
+    
+    def open_index(self, source_key, content_hash=None):
+        if content_hash is None:
+            entry = get_source_entry(source_key)
+        else:
+            entry = find_index_entry(source_key, content_hash)
+        if entry is None:
+            print(f"No up-to-date persisted index for {source_key}")
+            return None, None
+        
+        retriever = get_shared_retriever(
+            entry["index_version"], lambda: self._open_persisted_collection_retriever(entry, source_key)
+        )
+        if retriever is None:
+            return None, None
+        
+        print(f"Reopened persisted index for {source_key} ({entry['chunk_count']} chunks)")
+        return retriever, entry["index_version"]
+    
+    def build_index(self, source_key, content_hash, documents, progress_callback=None):
+        with index_build_lock():
+            retriever, index_version = self.open_index(source_key, content_hash)
+            if retriever is not None:
+                print(f"Index for {source_key} was built by another worker - reusing it")
+                return retriever, index_version
+            
+            if progress_callback is not None:
+                progress_callback("chunking", {})
+            doc_splits = self.create_document_chunks(documents)
+            
+            if progress_callback is not None:
+                progress_callback("embedding", {})
+            progress = self._new_progress(total_pages=len(documents))
+            progress["pages"] = len(documents)
+            chroma_db = self._sync_collection(source_key, content_hash, doc_splits, progress, progress_callback)
+        
+        retriever = self._as_source_retriever(chroma_db, source_key)
+        index_version = build_index_version(content_hash)
+        set_shared_retriever(index_version, retriever)
+        return retriever, index_version
+    
+    def build_index_streaming(self, source_key, content_hash, documents, total_pages=None, progress_callback=None):
+        """Indexes an iterator of pages, splitting, embedding and upserting INGEST_BATCH_SIZE chunks at a time.
+
+        Only the current page and one batch of chunks are held in memory. progress_callback receives
+        ("batch", {"pages", "total_pages", "chunks", "embedded", "skipped", "batches"}) after every batch.
+        """
+        with index_build_lock():
+            retriever, index_version = self.open_index(source_key, content_hash)
+            if retriever is not None:
+                print(f"Index for {source_key} was built by another worker - reusing it")
+                return retriever, index_version
+            
+            progress = self._new_progress(total_pages=total_pages)
+            chroma_db = self._sync_collection(
+                source_key, content_hash, self._split_pages(documents, progress), progress, progress_callback
+            )
+        
+        print(f"Streamed {progress['pages']} pages into {progress['chunks']} chunks ({progress['batches']} batches)")
+        retriever = self._as_source_retriever(chroma_db, source_key)
+        index_version = build_index_version(content_hash)
+        set_shared_retriever(index_version, retriever)
+        return retriever, index_version
+    
+    def open_corpus(self, where=None):
+        """Returns (retriever, corpus_version) over every indexed corpus source, filtered in Chroma by where."""
+        entries = get_corpus_entries()
+        if not entries:
+            print("No indexed sources in the corpus collection")
+            return None, None
+        
+        # Only the unfiltered retriever is shared, so client filter combinations don't pin retrievers in the registry;
+        # each query gets a shallow copy carrying its where (same vector store and BM25 index)
+        retriever = get_shared_retriever(
+            build_corpus_version(entries),
+            lambda: self.create_retriever(self.open_collection(CORPUS_COLLECTION_NAME))
+        )
+        if where:
+            retriever = retriever.model_copy(update={"where": where})
+        return retriever, build_corpus_version(entries, where)
+    
+    def get_corpus_files(self):
+        return [
+            {"source_key": source_key, "file_name": entry.get("file_name"), "file_type": entry.get("file_type"),
+             "chunk_count": entry["chunk_count"]}
+            for source_key, entry in sorted(get_corpus_entries().items())
+        ]
+    
+    def remove_source(self, source_key):
+        with index_build_lock():
+            chroma_db = self.open_collection(get_collection_name(source_key))
+            chunk_ids = self._get_source_chunk_ids(chroma_db, source_key)
+            if chunk_ids:
+                chroma_db.delete(ids=chunk_ids)
+                bm25_index = self.get_bm25_index(get_collection_name(source_key), chroma_db)
+                for chunk_id in chunk_ids:
+                    bm25_index.remove(chunk_id)
+                bm25_index.save()
+            remove_index_entry(source_key)
+        print(f"Removed {source_key} from the index ({len(chunk_ids)} chunks)")
+    
+    def _split_pages(self, documents, progress):
+        chunk_number = 0
+        for page_splits in split_documents_in_order(documents):
+            progress["pages"] += 1
+            for split in page_splits:
+                split.metadata["chunk_id"] = chunk_number
+                chunk_number += 1
+                yield split
+    
+    def _new_progress(self, total_pages=None):
+        return {
+            "pages": 0, "total_pages": total_pages, "chunks": 0, "embedded": 0, "skipped": 0, "batches": 0,
+            "tokens": 0, "embedding_seconds": 0.0, "chunks_per_second": 0.0, "tokens_per_second": 0.0
+        }
+    
+    def _sync_collection(self, source_key, content_hash, doc_splits, progress, progress_callback):
+        """Diffs doc_splits against the source's collection by deterministic chunk ID.
+
+        New chunks are embedded and added, unchanged ones only get their metadata refreshed and chunks
+        no longer produced by the source are deleted. Must be called under index_build_lock.
+        """
+        chroma_db = self.open_collection(get_collection_name(source_key))
+        bm25_index = self.get_bm25_index(get_collection_name(source_key), chroma_db)
+        stale_ids = set(self._get_source_chunk_ids(chroma_db, source_key))
+        occurrences = {}
+        batch = []
+        file_name, file_type = None, None
+        
+        for split in doc_splits:
+            split.metadata["source_key"] = source_key
+            if file_name is None:
+                file_name, file_type = split.metadata.get("file_name"), split.metadata.get("file_type")
+            chunk_hash = hash_bytes(split.page_content.encode("utf-8"))
+            occurrence = occurrences.get(chunk_hash, 0)
+            occurrences[chunk_hash] = occurrence + 1
+            chunk_id = build_chunk_id(source_key, chunk_hash, occurrence)
+            batch.append((chunk_id, split, chunk_id in stale_ids))
+            stale_ids.discard(chunk_id)
+            progress["chunks"] += 1
+            if len(batch) >= INGEST_BATCH_SIZE:
+                self._upsert_batch(chroma_db, bm25_index, batch, progress, progress_callback)
+                batch = []
+        
+        if batch:
+            self._upsert_batch(chroma_db, bm25_index, batch, progress, progress_callback)
+        
+        if stale_ids:
+            chroma_db.delete(ids=list(stale_ids))
+            for chunk_id in stale_ids:
+                bm25_index.remove(chunk_id)
+        bm25_index.save()
+        
+        print(f"Synced {source_key}: {progress['embedded']} embedded, {progress['skipped']} unchanged, "
+              f"{len(stale_ids)} removed")
+        record_index_entry(source_key, content_hash, progress["chunks"], file_name=file_name, file_type=file_type)
+        return chroma_db
+    
+    def _get_source_chunk_ids(self, chroma_db, source_key, limit=None):
+        if CORPUS_MODE:
+            return chroma_db.get(where={"source_key": source_key}, limit=limit, include=[])["ids"]
+        return chroma_db.get(limit=limit, include=[])["ids"]
+    
+    def _as_source_retriever(self, chroma_db, source_key):
+        return self.create_retriever(chroma_db, {"source_key": source_key} if CORPUS_MODE else None)
+    
+    def create_retriever(self, chroma_db, where=None):
+        search_settings = {
+            "vector_store": chroma_db,
+            # With reranking on, retrieval over-fetches and the rerank node cuts back to RERANK_TOP_N
+            "k": RERANK_FETCH_K if RERANK_ENABLED else RETRIEVER_K,
+            "where": where,
+            "search_type": RETRIEVER_SEARCH_TYPE,
+            "score_threshold": RETRIEVER_SCORE_THRESHOLD,
+            "fetch_k": HYBRID_FETCH_K,
+            "lambda_mult": MMR_LAMBDA_MULT,
+            "adaptive_k_ratio": ADAPTIVE_K_SCORE_RATIO if ADAPTIVE_K else None,
+            "min_k": ADAPTIVE_K_MIN,
+        }
+        if RETRIEVER_MODE == "hybrid":
+            return HybridRetriever(
+                bm25_index=self.get_bm25_index(chroma_db._collection.name, chroma_db),
+                rrf_k=RRF_K,
+                **search_settings
+            )
+        return VectorRetriever(**search_settings)
+    
+    def get_bm25_index(self, collection_name, chroma_db):
+        """Process-wide BM25 index of a collection; rebuilt from the stored chunks if it was never persisted."""
+        return get_shared_resource(
+            "bm25_index", collection_name, lambda: self._load_or_rebuild_bm25_index(collection_name, chroma_db)
+        )
+    
+    def _load_or_rebuild_bm25_index(self, collection_name, chroma_db):
+        path = get_bm25_index_path(collection_name)
+        bm25_index = BM25Index.load(path, k1=BM25_K1, b=BM25_B)
+        if bm25_index is not None:
+            return bm25_index
+        
+        bm25_index = BM25Index(path, k1=BM25_K1, b=BM25_B)
+        stored = chroma_db.get(include=["documents", "metadatas"])
+        for chunk_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"]):
+            bm25_index.add(chunk_id, text, metadata or {})
+        bm25_index.save()
+        print(f"Built BM25 index for {collection_name} from {len(bm25_index)} stored chunks")
+        return bm25_index
+    
+    def _upsert_batch(self, chroma_db, bm25_index, batch, progress, progress_callback):
+        new_chunks = [(chunk_id, split) for chunk_id, split, exists in batch if not exists]
+        unchanged_chunks = [(chunk_id, split) for chunk_id, split, exists in batch if exists]
+        
+        if new_chunks:
+            texts = [split.page_content for _, split in new_chunks]
+            chroma_db._collection.upsert(
+                ids=[chunk_id for chunk_id, _ in new_chunks],
+                embeddings=self.embedding_pipeline.embed_documents(texts),
+                metadatas=[split.metadata for _, split in new_chunks],
+                documents=texts
+            )
+            self._record_throughput(progress, self.embedding_pipeline.last_stats)
+            for chunk_id, split in new_chunks:
+                bm25_index.add(chunk_id, split.page_content, split.metadata)
+        if unchanged_chunks:
+            # Positions may have shifted around edited sections; refresh metadata without re-embedding
+            chroma_db._collection.update(
+                ids=[chunk_id for chunk_id, _ in unchanged_chunks],
+                metadatas=[split.metadata for _, split in unchanged_chunks]
+            )
+            for chunk_id, split in unchanged_chunks:
+                bm25_index.update_metadata(chunk_id, split.metadata)
+        # Commit the BM25 rows with every Chroma batch, so an interrupted sync never leaves chunks without postings
+        bm25_index.save()
+        
+        progress["embedded"] += len(new_chunks)
+        progress["skipped"] += len(unchanged_chunks)
+        progress["batches"] += 1
+        if progress_callback is not None:
+            progress_callback("batch", dict(progress))
+    
+    def _record_throughput(self, progress, stats):
+        progress["tokens"] += stats["tokens"]
+        progress["embedding_seconds"] += stats["seconds"]
+        if progress["embedding_seconds"]:
+            progress["chunks_per_second"] = (progress["embedded"] + stats["chunks"]) / progress["embedding_seconds"]
+            progress["tokens_per_second"] = progress["tokens"] / progress["embedding_seconds"]
+    
+    def create_document_chunks(self, documents):
+        doc_splits = split_documents(documents)
+        
+        for i, split in enumerate(doc_splits):
+            split.metadata.update({
+                "chunk_id": i,
+                "total_chunks": len(doc_splits)
+            })
+        
+        return doc_splits
+    
+    def open_collection(self, collection_name):
+        if CHROMA_SERVER_HOST:
+            client = get_shared_resource(
+                "chroma_client", (CHROMA_SERVER_HOST, CHROMA_SERVER_PORT), _create_chroma_http_client
+            )
+            return Chroma(collection_name=collection_name, embedding_function=self.embedding_function, client=client)
+        return Chroma(
+            collection_name=collection_name,
+            embedding_function=self.embedding_function,
+            persist_directory=CHROMA_PERSIST_DIR
+        )
+    
+    def _open_persisted_collection_retriever(self, entry, source_key):
+        chroma_db = self.open_collection(entry["collection_name"])
+        if not self._get_source_chunk_ids(chroma_db, source_key, limit=1):
+            print(f"Persisted collection {entry['collection_name']} has no chunks for {source_key} - rebuilding")
+            return None
+        return self._as_source_retriever(chroma_db, source_key)
@@ -1,6 +1,6 @@
 import tempfile
 import os
-from typing import List
+from typing import Iterator, List, Optional
 from pathlib import Path
 import logging
 
@@ -18,32 +18,13 @@ class StreamlitMultiFormatDocumentLoader:
     def load_document(self, file_path: str) -> List[Document]:
         return self.base_loader.load_document(file_path)
     
-    def load_uploaded_file(self, uploaded_file) -> List[Document]:
-        file_extension = uploaded_file.name.split('.')[-1].lower()
-        
-        if not self.base_loader.is_supported_format(f"dummy.{file_extension}"):
-            raise ValueError(f"Unsupported file type: {file_extension}")
-        
-        with tempfile.NamedTemporaryFile(
-            delete=False, 
-            suffix=f".{file_extension}",
-            prefix=f"uploaded_{uploaded_file.name.split('.')[0]}_"
-        ) as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_file_path = tmp_file.name
+    def load_uploaded_file(self, uploaded_file, buffer: Optional[memoryview] = None) -> List[Document]:
+        buffer = buffer if buffer is not None else self.read_upload_buffer(uploaded_file)
         
         try:
-            logger.info(f"Processing uploaded file: {uploaded_file.name} (size: {len(uploaded_file.getvalue())} bytes)")
+            logger.info(f"Processing uploaded file: {uploaded_file.name} (size: {buffer.nbytes} bytes)")
             
-            documents = self.base_loader.load_document(tmp_file_path)
-            
-            for doc in documents:
-                doc.metadata.update({
-                    "original_filename": uploaded_file.name,
-                    "upload_size": len(uploaded_file.getvalue()),
-                    "upload_type": uploaded_file.type if hasattr(uploaded_file, 'type') else 'unknown',
-                    "processed_via": "streamlit_upload"
-                })
+            documents = list(self._iter_upload_documents(uploaded_file, buffer))
             
             logger.info(f"Successfully processed {uploaded_file.name}: {len(documents)} chunks extracted")
             return documents
@@ -51,25 +32,118 @@ class StreamlitMultiFormatDocumentLoader:
         except Exception as e:
             logger.error(f"Error processing uploaded file {uploaded_file.name}: {str(e)}")
             raise Exception(f"Failed to process uploaded file {uploaded_file.name}: {str(e)}")
+    
+    def lazy_load_document(self, file_path: str) -> Iterator[Document]:
+        return self.base_loader.lazy_load_document(file_path)
+    
+    def load_files(self, file_paths: List[str], max_workers: Optional[int] = None, timeout: Optional[float] = None):
+        return self.base_loader.load_files(file_paths, max_workers=max_workers, timeout=timeout)
+    
+    def lazy_load_uploaded_file(self, uploaded_file, buffer: Optional[memoryview] = None) -> Iterator[Document]:
+        buffer = buffer if buffer is not None else self.read_upload_buffer(uploaded_file)
+        
+        try:
+            logger.info(f"Streaming uploaded file: {uploaded_file.name} (size: {buffer.nbytes} bytes)")
+            yield from self._iter_upload_documents(uploaded_file, buffer)
+        except Exception as e:
+            logger.error(f"Error processing uploaded file {uploaded_file.name}: {str(e)}")
+            raise Exception(f"Failed to process uploaded file {uploaded_file.name}: {str(e)}")
+    
+    def estimate_page_count(self, file_path: str) -> Optional[int]:
+        return self.base_loader.estimate_page_count(file_path)
+    
+    def estimate_uploaded_page_count(self, uploaded_file, buffer: Optional[memoryview] = None) -> Optional[int]:
+        buffer = buffer if buffer is not None else self.read_upload_buffer(uploaded_file)
+        return self.base_loader.estimate_page_count(uploaded_file.name, data=buffer)
+    
+    def read_upload_buffer(self, uploaded_file) -> memoryview:
+        # getvalue() copies the upload on every call; callers read it once and pass the view to every upload method
+        return memoryview(uploaded_file.getvalue())
+    
+    def _iter_upload_documents(self, uploaded_file, buffer: memoryview) -> Iterator[Document]:
+        """Parses formats with file-like parsers straight from memory and falls back to a temp file otherwise."""
+        if not self.is_supported_file(uploaded_file.name):
+            raise ValueError(f"Unsupported file type: {uploaded_file.name.split('.')[-1].lower()}")
+        
+        if self.base_loader.can_load_from_bytes(uploaded_file.name):
+            for doc in self.base_loader.lazy_load_bytes(buffer, uploaded_file.name):
+                self._add_upload_metadata([doc], uploaded_file, buffer.nbytes, "streamlit_upload_memory")
+                yield doc
+            return
+        
+        tmp_file_path = self._write_temp_file(uploaded_file, buffer)
+        try:
+            for doc in self.base_loader.lazy_load_document(tmp_file_path):
+                self._add_upload_metadata([doc], uploaded_file, buffer.nbytes)
+                yield doc
         finally:
-            try:
-                os.unlink(tmp_file_path)
-            except OSError:
-                logger.warning(f"Could not delete temporary file: {tmp_file_path}")
+            self._delete_temp_file(tmp_file_path)
     
-    def load_multiple_uploaded_files(self, uploaded_files) -> List[Document]:
-        all_documents = []
+    def _write_temp_file(self, uploaded_file, buffer: Optional[memoryview] = None) -> str:
+        file_extension = uploaded_file.name.split('.')[-1].lower()
+        
+        if not self.base_loader.is_supported_format(f"dummy.{file_extension}"):
+            raise ValueError(f"Unsupported file type: {file_extension}")
+        
+        if buffer is None:
+            buffer = self.read_upload_buffer(uploaded_file)
+        
+        with tempfile.NamedTemporaryFile(
+            delete=False, 
+            suffix=f".{file_extension}",
+            prefix=f"uploaded_{uploaded_file.name.split('.')[0]}_"
+        ) as tmp_file:
+            tmp_file.write(buffer)
+            return tmp_file.name
+    
+    def _add_upload_metadata(self, documents: List[Document], uploaded_file, upload_size: int,
+                             processed_via: str = "streamlit_upload"):
+        for doc in documents:
+            doc.metadata.update({
+                "original_filename": uploaded_file.name,
+                "file_name": uploaded_file.name,
+                "upload_size": upload_size,
+                "upload_type": uploaded_file.type if hasattr(uploaded_file, 'type') else 'unknown',
+                "processed_via": processed_via
+            })
+    
+    def _delete_temp_file(self, tmp_file_path: str):
+        try:
+            os.unlink(tmp_file_path)
+        except OSError:
+            logger.warning(f"Could not delete temporary file: {tmp_file_path}")
+    
+    def load_multiple_uploaded_files(self, uploaded_files, max_workers: Optional[int] = None,
+                                     timeout: Optional[float] = None) -> List[Document]:
+        staged_files = []
         failed_files = []
         
         for uploaded_file in uploaded_files:
             try:
-                documents = self.load_uploaded_file(uploaded_file)
-                all_documents.extend(documents)
-                logger.info(f"Successfully loaded {uploaded_file.name}")
+                buffer = self.read_upload_buffer(uploaded_file)
+                staged_files.append((uploaded_file, self._write_temp_file(uploaded_file, buffer), buffer.nbytes))
             except Exception as e:
                 logger.warning(f"Failed to load {uploaded_file.name}: {str(e)}")
                 failed_files.append(uploaded_file.name)
         
+        try:
+            loaded_by_index, _ = self.base_loader.load_files(
+                [tmp_file_path for _, tmp_file_path, _ in staged_files], max_workers=max_workers, timeout=timeout
+            )
+        finally:
+            for _, tmp_file_path, _ in staged_files:
+                self._delete_temp_file(tmp_file_path)
+        
+        all_documents = []
+        for index, (uploaded_file, _, upload_size) in enumerate(staged_files):
+            documents = loaded_by_index.get(index)
+            if documents is None:
+                failed_files.append(uploaded_file.name)
+                continue
+            self._add_upload_metadata(documents, uploaded_file, upload_size)
+            all_documents.extend(documents)
+            logger.info(f"Successfully loaded {uploaded_file.name}")
+        
         if failed_files:
             logger.warning(f"Failed to load {len(failed_files)} files: {failed_files}")
         
@@ -86,12 +160,13 @@ class StreamlitMultiFormatDocumentLoader:
     def is_supported_file(self, filename: str) -> bool:
         return self.base_loader.is_supported_format(filename)
     
-    def get_upload_info(self, uploaded_file) -> dict:
+    def get_upload_info(self, uploaded_file, buffer: Optional[memoryview] = None) -> dict:
         file_extension = uploaded_file.name.split('.')[-1].lower()
+        buffer = buffer if buffer is not None else self.read_upload_buffer(uploaded_file)
         
         return {
             "filename": uploaded_file.name,
-            "size": len(uploaded_file.getvalue()),
+            "size": buffer.nbytes,
             "extension": file_extension,
             "is_supported": self.is_supported_file(uploaded_file.name),
             "type": uploaded_file.type if hasattr(uploaded_file, 'type') else 'unknown'
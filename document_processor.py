@@ -1,10 +1,15 @@
+import json
+import os
 import streamlit as st
 import time
-from langchain.text_splitter import CharacterTextSplitter
-from langchain_chroma import Chroma
-from langchain_openai import OpenAIEmbeddings
+from pathlib import Path
 
-from config import CHUNK_SIZE, CHUNK_OVERLAP, CHROMA_COLLECTION_NAME, CHROMA_PERSIST_DIR
+from config import STREAMING_INGESTION, LOADER_MAX_WORKERS
+from document_indexer import DocumentIndexer, build_metadata_filter
+from index_manifest import (
+    hash_file, hash_bytes, get_local_source_key, get_upload_source_key, get_corpus_entries, build_index_version
+)
+from resource_registry import get_shared_resource
 from utils import get_file_key
 from ui_components import render_file_analysis
 
@@ -12,24 +17,31 @@ class DocumentProcessor:
     
     def __init__(self, document_loader):
         self.document_loader = document_loader
-        self.embedding_function = OpenAIEmbeddings()
+        self.indexer = DocumentIndexer()
     
     def process_local_file(self, file_path):
         if not file_path:
             return None
         
-        current_file_key = f"local_{file_path}"
+        current_file_key = get_local_source_key(file_path)
         if st.session_state.get('processed_file') == current_file_key:
             return st.session_state.get('retriever')
         
         try:
-            return self._process_local_file_pipeline(file_path, current_file_key)
+            file_stat = os.stat(file_path)
+            content_hash = get_shared_resource(
+                "file_hash", (file_path, file_stat.st_mtime, file_stat.st_size), lambda: hash_file(file_path)
+            )
+            persisted_retriever = self._open_persisted_retriever(current_file_key, content_hash)
+            if persisted_retriever is not None:
+                return persisted_retriever
+            return self._process_local_file_pipeline(file_path, current_file_key, content_hash)
         except Exception as e:
             st.error(f"❌ Error processing local file: {str(e)}")
             st.info("💡 Please make sure the file exists and is in a supported format.")
             return None
     
-    def _process_local_file_pipeline(self, file_path, current_file_key):
+    def _process_local_file_pipeline(self, file_path, current_file_key, content_hash):
         st.markdown("### 🔄 Processing Status")
         
         progress_bar = st.progress(0)
@@ -38,19 +50,25 @@ class DocumentProcessor:
         try:
             status_text.text("🔄 Carregando documento local...")
             progress_bar.progress(25)
-            documents = self.document_loader.load_document(file_path)
+            
+            if STREAMING_INGESTION:
+                retriever, index_version = self.indexer.build_index_streaming(
+                    current_file_key, content_hash, self.document_loader.lazy_load_document(file_path),
+                    total_pages=self.document_loader.estimate_page_count(file_path),
+                    progress_callback=lambda stage, info: self._render_index_progress(stage, info, progress_bar, status_text)
+                )
+                st.success(f"✅ Conteúdo extraído com sucesso de {file_path}")
+            else:
+                documents = self.document_loader.load_document(file_path)
 
-            status_text.text("🔍 Extraindo conteúdo...")
-            progress_bar.progress(50)
-            st.success(f"✅ Conteúdo extraído com sucesso de {file_path}")
+                status_text.text("🔍 Extraindo conteúdo...")
+                progress_bar.progress(50)
+                st.success(f"✅ Conteúdo extraído com sucesso de {file_path}")
 
-            progress_bar.progress(75)
-            status_text.text("✂️ Dividindo em partes...")
-            doc_splits = self._create_document_chunks(documents)
-
-            progress_bar.progress(90)
-            status_text.text("🧠 Criando embeddings...")
-            chroma_db = self._create_vector_database(doc_splits)
+                retriever, index_version = self.indexer.build_index(
+                    current_file_key, content_hash, documents,
+                    progress_callback=lambda stage, info: self._render_index_progress(stage, info, progress_bar, status_text)
+                )
 
             progress_bar.progress(100)
             status_text.text("✅ Processamento concluído!")
@@ -59,9 +77,9 @@ class DocumentProcessor:
             progress_bar.empty()
             status_text.empty()
             
-            retriever = chroma_db.as_retriever()
             st.session_state.processed_file = current_file_key
             st.session_state.retriever = retriever
+            st.session_state.index_version = index_version
             
             print(f"Local file retriever created successfully: {retriever is not None}")
             print(f"Session state updated with file key: {current_file_key}")
@@ -79,6 +97,87 @@ class DocumentProcessor:
             status_text.empty()
             raise e
     
+    def process_corpus_directory(self, directory):
+        """Indexes every supported file under directory into the shared corpus collection.
+
+        The sync runs once per process for a given set of file paths, mtimes and sizes; later sessions reuse it.
+        """
+        file_paths = sorted(
+            str(path) for path in Path(directory).rglob("*")
+            if path.is_file() and self.document_loader.is_supported_file(path.name)
+        )
+        file_stats = {file_path: os.stat(file_path) for file_path in file_paths}
+        fingerprint = hash_bytes(json.dumps(
+            [(file_path, file_stat.st_mtime_ns, file_stat.st_size) for file_path, file_stat in file_stats.items()]
+        ).encode("utf-8"))
+        return get_shared_resource(
+            "corpus_sync", (os.path.abspath(directory), fingerprint),
+            lambda: self._sync_corpus_directory(file_stats)
+        )
+    
+    def _sync_corpus_directory(self, file_stats):
+        # One manifest read per pass; build_index re-checks under the build lock
+        corpus_entries = get_corpus_entries()
+        local_prefix = get_local_source_key("")
+        stale_keys = {source_key for source_key in corpus_entries if source_key.startswith(local_prefix)}
+        
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+        indexed_count = 0
+        changed_files = []
+        
+        for file_path, file_stat in file_stats.items():
+            source_key = get_local_source_key(file_path)
+            stale_keys.discard(source_key)
+            try:
+                content_hash = get_shared_resource(
+                    "file_hash", (file_path, file_stat.st_mtime, file_stat.st_size), lambda: hash_file(file_path)
+                )
+            except Exception as e:
+                st.warning(f"⚠️ Não foi possível indexar {file_path}: {str(e)}")
+                continue
+            
+            entry = corpus_entries.get(source_key)
+            if entry is None or entry["index_version"] != build_index_version(content_hash):
+                changed_files.append((file_path, source_key, content_hash))
+            else:
+                indexed_count += 1
+        
+        # New and changed files are parsed in the loader's process pool, LOADER_MAX_WORKERS at a time,
+        # so only one batch of parsed pages is held in memory while it is indexed
+        for batch_start in range(0, len(changed_files), LOADER_MAX_WORKERS):
+            batch = changed_files[batch_start:batch_start + LOADER_MAX_WORKERS]
+            batch_end = batch_start + len(batch)
+            status_text.text(f"📚 Indexando corpus: arquivos {batch_start + 1}-{batch_end} de {len(changed_files)} novos ou alterados")
+            
+            loaded_by_index, _ = self.document_loader.load_files([file_path for file_path, _, _ in batch])
+            for index, (file_path, source_key, content_hash) in enumerate(batch):
+                documents = loaded_by_index.pop(index, None)
+                if documents is None:
+                    st.warning(f"⚠️ Não foi possível carregar {file_path}")
+                    continue
+                try:
+                    self.indexer.build_index(source_key, content_hash, documents)
+                    indexed_count += 1
+                except Exception as e:
+                    st.warning(f"⚠️ Não foi possível indexar {file_path}: {str(e)}")
+            
+            progress_bar.progress(int(100 * batch_end / len(changed_files)))
+        
+        for source_key in stale_keys:
+            self.indexer.remove_source(source_key)
+        
+        progress_bar.empty()
+        status_text.empty()
+        return indexed_count
+    
+    def open_corpus_retriever(self, file_names=None, file_types=None):
+        retriever, index_version = self.indexer.open_corpus(build_metadata_filter(file_names, file_types))
+        st.session_state.processed_file = "corpus"
+        st.session_state.retriever = retriever
+        st.session_state.index_version = index_version
+        return retriever
+    
     def process_file(self, user_file):
         if user_file is None:
             return None
@@ -95,7 +194,8 @@ class DocumentProcessor:
             return None
     
     def _process_new_file(self, user_file, current_file_key):
-        file_info = self.document_loader.get_upload_info(user_file)
+        buffer = self.document_loader.read_upload_buffer(user_file)
+        file_info = self.document_loader.get_upload_info(user_file, buffer)
         render_file_analysis(file_info)
         
         if not file_info['is_supported']:
@@ -103,9 +203,15 @@ class DocumentProcessor:
             st.info(f"📋 Supported formats: {self.document_loader.get_supported_extensions_display()}")
             return None
         
-        return self._execute_processing_pipeline(user_file, file_info, current_file_key)
+        source_key = get_upload_source_key(user_file.name)
+        content_hash = hash_bytes(buffer)
+        persisted_retriever = self._open_persisted_retriever(current_file_key, content_hash, source_key)
+        if persisted_retriever is not None:
+            return persisted_retriever
+        
+        return self._execute_processing_pipeline(user_file, buffer, file_info, current_file_key, content_hash, source_key)
     
-    def _execute_processing_pipeline(self, user_file, file_info, current_file_key):
+    def _execute_processing_pipeline(self, user_file, buffer, file_info, current_file_key, content_hash, source_key):
         st.markdown("### 🔄 Processing Status")
         
         progress_bar = st.progress(0)
@@ -114,19 +220,25 @@ class DocumentProcessor:
         try:
             status_text.text("🔄 Carregando documento...")
             progress_bar.progress(25)
-            documents = self.document_loader.load_uploaded_file(user_file)
+            
+            if STREAMING_INGESTION:
+                retriever, index_version = self.indexer.build_index_streaming(
+                    source_key, content_hash, self.document_loader.lazy_load_uploaded_file(user_file, buffer),
+                    total_pages=self.document_loader.estimate_uploaded_page_count(user_file, buffer),
+                    progress_callback=lambda stage, info: self._render_index_progress(stage, info, progress_bar, status_text)
+                )
+                st.success(f"✅ Conteúdo extraído com sucesso de {file_info['filename']}")
+            else:
+                documents = self.document_loader.load_uploaded_file(user_file, buffer)
 
-            status_text.text("🔍 Extraindo conteúdo...")
-            progress_bar.progress(50)
-            st.success(f"✅ Conteúdo extraído com sucesso de {file_info['filename']}")
+                status_text.text("🔍 Extraindo conteúdo...")
+                progress_bar.progress(50)
+                st.success(f"✅ Conteúdo extraído com sucesso de {file_info['filename']}")
 
-            progress_bar.progress(75)
-            status_text.text("✂️ Dividindo em partes...")
-            doc_splits = self._create_document_chunks(documents)
-
-            progress_bar.progress(90)
-            status_text.text("🧠 Criando embeddings...")
-            chroma_db = self._create_vector_database(doc_splits)
+                retriever, index_version = self.indexer.build_index(
+                    source_key, content_hash, documents,
+                    progress_callback=lambda stage, info: self._render_index_progress(stage, info, progress_bar, status_text)
+                )
 
             progress_bar.progress(100)
             status_text.text("✅ Processamento concluído!")
@@ -135,9 +247,9 @@ class DocumentProcessor:
             progress_bar.empty()
             status_text.empty()
             
-            retriever = chroma_db.as_retriever()
             st.session_state.processed_file = current_file_key
             st.session_state.retriever = retriever
+            st.session_state.index_version = index_version
             
             print(f"Retriever criado com sucesso: {retriever is not None}")
             print(f"Session state atualizado com a chave do arquivo: {current_file_key}")
@@ -155,30 +267,31 @@ class DocumentProcessor:
             status_text.empty()
             raise e
     
-    def _create_document_chunks(self, documents):
-        document_texts = [doc.page_content for doc in documents]
-        
-        splitter = CharacterTextSplitter.from_tiktoken_encoder(
-            chunk_size=CHUNK_SIZE, 
-            chunk_overlap=CHUNK_OVERLAP
-        )
-        doc_splits = splitter.create_documents(document_texts)
-        
-        for i, split in enumerate(doc_splits):
-            original_doc_index = min(i, len(documents) - 1)
-            split.metadata.update(documents[original_doc_index].metadata)
-            split.metadata.update({
-                "chunk_id": i,
-                "total_chunks": len(doc_splits),
-                "chunk_size": len(split.page_content)
-            })
-        
-        return doc_splits
+    def _render_index_progress(self, stage, info, progress_bar, status_text):
+        if stage == "chunking":
+            progress_bar.progress(75)
+            status_text.text("✂️ Dividindo em partes...")
+        elif stage == "embedding":
+            progress_bar.progress(90)
+            status_text.text("🧠 Criando embeddings...")
+        elif stage == "batch":
+            if info.get("total_pages"):
+                progress = 25 + int(70 * min(info["pages"], info["total_pages"]) / info["total_pages"])
+            else:
+                progress = min(95, 25 + 5 * info["batches"])
+            progress_bar.progress(progress)
+            status_text.text(
+                f"🧠 Indexando: {info['pages']} páginas, {info['chunks']} partes "
+                f"({info['embedded']} novas, {info['skipped']} inalteradas, {info['batches']} lotes) - "
+                f"{info['chunks_per_second']:.1f} partes/s, {info['tokens_per_second']:.0f} tokens/s"
+            )
     
-    def _create_vector_database(self, doc_splits):
-        return Chroma.from_documents(
-            documents=doc_splits, 
-            collection_name=CHROMA_COLLECTION_NAME, 
-            embedding=self.embedding_function,
-            persist_directory=CHROMA_PERSIST_DIR
-        )
\ No newline at end of file
+    def _open_persisted_retriever(self, current_file_key, content_hash, source_key=None):
+        retriever, index_version = self.indexer.open_index(source_key or current_file_key, content_hash)
+        if retriever is None:
+            return None
+        
+        st.session_state.processed_file = current_file_key
+        st.session_state.retriever = retriever
+        st.session_state.index_version = index_version
+        return retriever
@@ -0,0 +1,155 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+from text_normalization import normalize_question
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that persists document vectors in SQLite keyed by (model, sha256(text)).
+
+    Only texts missing from the cache are sent to the underlying embeddings, and the least
+    recently used rows are evicted once the cache grows beyond max_entries. Query vectors are kept
+    in an in-memory LRU keyed by the normalized question, so near-identical questions embed once.
+    """
+
+    def __init__(self, embeddings: Embeddings, model: str, cache_path: str, max_entries: int = 100_000,
+                 query_max_entries: int = 1024):
+        self.embeddings = embeddings
+        self.model = model
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.query_max_entries = query_max_entries
+        self.hits = 0
+        self.misses = 0
+        self.query_hits = 0
+        self.query_misses = 0
+        self._query_vectors = OrderedDict()
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._connection = sqlite3.connect(cache_path, check_same_thread=False)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )"""
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._connection.commit()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        text_hashes = [self.hash_text(text) for text in texts]
+        cached_vectors = self._lookup(set(text_hashes))
+
+        missing = {}
+        for text, text_hash in zip(texts, text_hashes):
+            if text_hash not in cached_vectors and text_hash not in missing:
+                missing[text_hash] = text
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            new_vectors = self.embeddings.embed_documents(list(missing.values()))
+            new_entries = dict(zip(missing.keys(), new_vectors))
+            self._store(new_entries)
+            cached_vectors.update(new_entries)
+
+        print(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} misses")
+        return [cached_vectors[text_hash] for text_hash in text_hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = normalize_question(text)
+        with self._lock:
+            vector = self._query_vectors.get(key)
+            if vector is not None:
+                self._query_vectors.move_to_end(key)
+                self.query_hits += 1
+                return list(vector)
+            self.query_misses += 1
+
+        vector = self.embeddings.embed_query(text)
+        with self._lock:
+            self._query_vectors[key] = vector
+            self._query_vectors.move_to_end(key)
+            while len(self._query_vectors) > self.query_max_entries:
+                self._query_vectors.popitem(last=False)
+        return list(vector)
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            entries = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": entries,
+                "query_hits": self.query_hits,
+                "query_misses": self.query_misses,
+                "query_entries": len(self._query_vectors),
+            }
+
+    def _lookup(self, text_hashes) -> Dict[str, List[float]]:
+        if not text_hashes:
+            return {}
+
+        found = {}
+        hash_list = list(text_hashes)
+        with self._lock:
+            for start in range(0, len(hash_list), 500):
+                batch = hash_list[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model, *batch]
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = array("f", blob).tolist()
+
+            if found:
+                now = time.time()
+                self._connection.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, self.model, text_hash) for text_hash in found]
+                )
+                self._connection.commit()
+        return found
+
+    def _store(self, entries: Dict[str, List[float]]):
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(self.model, text_hash, array("f", vector).tobytes(), now) for text_hash, vector in entries.items()]
+            )
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self):
+        entries = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = entries - self.max_entries
+        if overflow > 0:
+            self._connection.execute(
+                "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+            print(f"Embedding cache: evicted {overflow} least recently used entries")
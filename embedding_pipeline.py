@@ -0,0 +1,94 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from document_chunker import count_tokens
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+class EmbeddingPipeline:
+    """Embeds texts in token-budgeted batches sent concurrently, retrying rate-limited batches with jittered backoff.
+
+    Throughput of the last call is kept in last_stats (chunks/s, tokens/s, retries).
+    """
+
+    def __init__(self, embeddings, max_batch_tokens: int = 16_000, max_concurrency: int = 4,
+                 max_retries: int = 6, backoff_base_seconds: float = 1.0, backoff_max_seconds: float = 60.0):
+        self.embeddings = embeddings
+        self.max_batch_tokens = max_batch_tokens
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.last_stats = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="embedding")
+
+    def build_batches(self, texts: List[str]):
+        """Groups text indexes so each batch stays within max_batch_tokens; returns (batches, total_tokens)."""
+        batches, current_batch, current_tokens, total_tokens = [], [], 0, 0
+        for index, text in enumerate(texts):
+            token_count = count_tokens(text)
+            total_tokens += token_count
+            if current_batch and current_tokens + token_count > self.max_batch_tokens:
+                batches.append(current_batch)
+                current_batch, current_tokens = [], 0
+            current_batch.append(index)
+            current_tokens += token_count
+        if current_batch:
+            batches.append(current_batch)
+        return batches, total_tokens
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            self.last_stats = self._build_stats(0, 0, 0.0, 0, 0)
+            return []
+
+        started_at = time.perf_counter()
+        batches, total_tokens = self.build_batches(texts)
+
+        futures = [
+            self._executor.submit(self._embed_batch_with_retry, [texts[index] for index in batch])
+            for batch in batches
+        ]
+        vectors = [None] * len(texts)
+        retries = 0
+        for batch, future in zip(batches, futures):
+            batch_vectors, batch_retries = future.result()
+            retries += batch_retries
+            for index, vector in zip(batch, batch_vectors):
+                vectors[index] = vector
+
+        self.last_stats = self._build_stats(
+            len(texts), total_tokens, time.perf_counter() - started_at, len(batches), retries
+        )
+        print(f"Embedded {len(texts)} chunks in {len(batches)} batches: "
+              f"{self.last_stats['chunks_per_second']:.1f} chunks/s, {self.last_stats['tokens_per_second']:.0f} tokens/s"
+              f" ({self.last_stats['retries']} rate-limit retries)")
+        return vectors
+
+    def _embed_batch_with_retry(self, batch_texts: List[str]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self.embeddings.embed_documents(batch_texts), attempt
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                # Full jitter keeps concurrent batches from retrying in lockstep
+                delay = random.uniform(0, min(self.backoff_max_seconds, self.backoff_base_seconds * 2 ** attempt))
+                print(f"Embedding batch rate limited, retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+
+    def _build_stats(self, chunks: int, tokens: int, seconds: float, batches: int, retries: int) -> Dict[str, Any]:
+        return {
+            "chunks": chunks,
+            "tokens": tokens,
+            "seconds": seconds,
+            "batches": batches,
+            "retries": retries,
+            "chunks_per_second": chunks / seconds if seconds else 0.0,
+            "tokens_per_second": tokens / seconds if seconds else 0.0,
+        }
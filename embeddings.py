@@ -0,0 +1,55 @@
+from langchain_openai import OpenAIEmbeddings
+
+from config import (
+    EMBEDDING_PROVIDER, OPENAI_EMBEDDING_MODEL, LOCAL_EMBEDDING_MODEL, LOCAL_EMBEDDING_BATCH_SIZE,
+    LOCAL_EMBEDDING_THREADS, EMBEDDING_MODEL, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES,
+    QUERY_EMBEDDING_CACHE_MAX_ENTRIES, EMBEDDING_BATCH_MAX_TOKENS, EMBEDDING_MAX_CONCURRENCY, EMBEDDING_MAX_RETRIES,
+    EMBEDDING_BACKOFF_BASE_SECONDS, EMBEDDING_BACKOFF_MAX_SECONDS
+)
+from embedding_cache import CachedEmbeddings
+from embedding_pipeline import EmbeddingPipeline
+from resource_registry import get_shared_embeddings, get_shared_resource
+
+
+def create_provider_embeddings():
+    if EMBEDDING_PROVIDER == "onnx":
+        from local_embeddings import OnnxMiniLMEmbeddings
+        return OnnxMiniLMEmbeddings(batch_size=LOCAL_EMBEDDING_BATCH_SIZE, num_threads=LOCAL_EMBEDDING_THREADS)
+    if EMBEDDING_PROVIDER == "sentence_transformers":
+        from local_embeddings import SentenceTransformerEmbeddings
+        return SentenceTransformerEmbeddings(
+            LOCAL_EMBEDDING_MODEL, batch_size=LOCAL_EMBEDDING_BATCH_SIZE, num_threads=LOCAL_EMBEDDING_THREADS
+        )
+    if EMBEDDING_PROVIDER != "openai":
+        raise ValueError(f"Unknown embedding provider: {EMBEDDING_PROVIDER}")
+    return OpenAIEmbeddings(model=OPENAI_EMBEDDING_MODEL)
+
+
+def _create_embedding_function():
+    return CachedEmbeddings(
+        create_provider_embeddings(),
+        model=EMBEDDING_MODEL,
+        cache_path=EMBEDDING_CACHE_PATH,
+        max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+        query_max_entries=QUERY_EMBEDDING_CACHE_MAX_ENTRIES
+    )
+
+
+def get_embedding_function():
+    return get_shared_embeddings(EMBEDDING_MODEL, _create_embedding_function)
+
+
+def _create_embedding_pipeline():
+    return EmbeddingPipeline(
+        get_embedding_function(),
+        max_batch_tokens=EMBEDDING_BATCH_MAX_TOKENS,
+        # Local models already use LOCAL_EMBEDDING_THREADS; concurrent batches would oversubscribe the CPU
+        max_concurrency=EMBEDDING_MAX_CONCURRENCY if EMBEDDING_PROVIDER == "openai" else 1,
+        max_retries=EMBEDDING_MAX_RETRIES,
+        backoff_base_seconds=EMBEDDING_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds=EMBEDDING_BACKOFF_MAX_SECONDS
+    )
+
+
+def get_embedding_pipeline():
+    return get_shared_resource("embedding_pipeline", EMBEDDING_MODEL, _create_embedding_pipeline)
@@ -0,0 +1,83 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from .bhc_dataset import get_all_questions
+
+
+def calibrate_grading_thresholds(retriever, questions: Optional[List[str]] = None,
+                                 target_precision: float = 0.95) -> Dict[str, Any]:
+    """Grades the reranked chunks of the BHC questions with the LLM and derives the similarity gate band.
+
+    accept_threshold is the lowest rerank score above which at least target_precision of the chunks were graded
+    relevant; reject_threshold the highest one below which at least target_precision were graded irrelevant.
+    """
+    from chains.evaluate import evaluate_docs
+    from config import GRADING_MAX_CONCURRENCY, RERANK_TOP_N
+    from reranker import get_reranker, get_scorer_name, rerank_documents
+
+    questions = questions or [bhc_question.question for bhc_question in get_all_questions()]
+    reranker = get_reranker()
+    samples = []
+
+    for question in questions:
+        documents, scores = rerank_documents(reranker, question, retriever.invoke(question), RERANK_TOP_N)
+        if not documents:
+            continue
+        verdicts = evaluate_docs.batch(
+            [{"question": question, "document": document.page_content} for document in documents],
+            config={"max_concurrency": GRADING_MAX_CONCURRENCY}
+        )
+        samples.extend((score, verdict.score.lower() == "yes") for score, verdict in zip(scores, verdicts))
+
+    accept_threshold = _accept_threshold(samples, target_precision)
+    reject_threshold = _reject_threshold(samples, target_precision)
+    if accept_threshold is not None and reject_threshold is not None:
+        reject_threshold = min(reject_threshold, accept_threshold)
+
+    return {
+        "scorer": get_scorer_name(),
+        "accept_threshold": accept_threshold,
+        "reject_threshold": reject_threshold,
+        "samples": len(samples),
+        "relevant_samples": sum(is_relevant for _, is_relevant in samples),
+        "target_precision": target_precision,
+    }
+
+
+def _accept_threshold(samples: List[Tuple[float, bool]], target_precision: float) -> Optional[float]:
+    threshold, relevant = None, 0
+    for count, (score, is_relevant) in enumerate(sorted(samples, key=lambda sample: sample[0], reverse=True), start=1):
+        relevant += is_relevant
+        if relevant / count >= target_precision:
+            threshold = score
+    return threshold
+
+
+def _reject_threshold(samples: List[Tuple[float, bool]], target_precision: float) -> Optional[float]:
+    # The gate rejects strictly below the threshold, so it sits halfway to the next score
+    ordered = sorted(samples, key=lambda sample: sample[0])
+    threshold, irrelevant = None, 0
+    for count, (score, is_relevant) in enumerate(ordered, start=1):
+        irrelevant += not is_relevant
+        if irrelevant / count >= target_precision:
+            next_score = ordered[count][0] if count < len(ordered) else score + 1e-6
+            threshold = (score + next_score) / 2
+    return threshold
+
+
+if __name__ == "__main__":
+    import os
+
+    from config import LOCAL_DOCUMENT_PATH
+    from document_indexer import DocumentIndexer
+    from index_manifest import get_local_source_key, hash_file
+
+    retriever, _ = DocumentIndexer().open_index(get_local_source_key(LOCAL_DOCUMENT_PATH), hash_file(LOCAL_DOCUMENT_PATH))
+    if retriever is None:
+        raise SystemExit(f"No index found for {os.path.abspath(LOCAL_DOCUMENT_PATH)} - open it in the app first")
+
+    result = calibrate_grading_thresholds(retriever)
+    print(f"Graded {result['samples']} chunks ({result['relevant_samples']} relevant)")
+    if result["accept_threshold"] is None or result["reject_threshold"] is None:
+        raise SystemExit("Not enough graded chunks reach the target precision - keep the gate off for this scorer")
+    print("Add to GRADING_GATE_THRESHOLDS in config.py:")
+    print(f'    "{result["scorer"]}": {{"reject": {result["reject_threshold"]:.4f}, "accept": {result["accept_threshold"]:.4f}}},')
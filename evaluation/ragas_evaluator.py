@@ -4,7 +4,7 @@ from typing import List, Dict, Any, Optional
 import json
 import time
 from dataclasses import dataclass
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field
 import numpy as np
@@ -14,7 +14,8 @@ def get_llm():
     return ChatOpenAI(temperature=0, model="gpt-4")
 
 def get_embeddings():
-    return OpenAIEmbeddings()
+    from embeddings import get_embedding_function
+    return get_embedding_function()
 
 @dataclass
 class RAGASResult:
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from config import (
+    CHUNK_SIZE, CHUNK_OVERLAP, CHUNK_TOKEN_ENCODING, CHUNKING_MODE, EMBEDDING_MODEL, CORPUS_MODE, CORPUS_COLLECTION_NAME,
+    CHROMA_COLLECTION_NAME, CHROMA_PERSIST_DIR, CHROMA_MANIFEST_FILE
+)
+
+
+def get_manifest_path() -> str:
+    return os.path.join(CHROMA_PERSIST_DIR, CHROMA_MANIFEST_FILE)
+
+
+def hash_bytes(data) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(file_path, block_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_index_params() -> Dict[str, Any]:
+    return {
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "chunk_token_encoding": CHUNK_TOKEN_ENCODING,
+        "chunking_mode": CHUNKING_MODE,
+        "embedding_model": EMBEDDING_MODEL,
+    }
+
+
+def build_index_version(content_hash: str) -> str:
+    payload = json.dumps({"content_hash": content_hash, **get_index_params()}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_local_source_key(file_path) -> str:
+    return f"local_{file_path}"
+
+
+def get_upload_source_key(file_name: str) -> str:
+    # Keyed by name only so a revised upload is diffed against the chunks of its previous version
+    return f"upload_{file_name}"
+
+
+def build_chunk_id(source_key: str, chunk_hash: str, occurrence: int = 0) -> str:
+    """Deterministic chunk ID; occurrence disambiguates identical chunks repeated within one source."""
+    return hashlib.sha256(f"{source_key}\0{chunk_hash}\0{occurrence}".encode("utf-8")).hexdigest()
+
+
+def get_bm25_index_path(collection_name: str) -> str:
+    return os.path.join(CHROMA_PERSIST_DIR, "bm25", f"{collection_name}.sqlite")
+
+
+def get_collection_name(source_key: str) -> str:
+    if CORPUS_MODE:
+        return CORPUS_COLLECTION_NAME
+    source_hash = hashlib.sha256(source_key.encode("utf-8")).hexdigest()[:16]
+    return f"{CHROMA_COLLECTION_NAME}-{source_hash}"
+
+
+@contextmanager
+def index_build_lock():
+    """Serializes index builds and manifest writes across threads and worker processes sharing CHROMA_PERSIST_DIR."""
+    os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
+    with open(os.path.join(CHROMA_PERSIST_DIR, ".index.lock"), "w") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_manifest() -> Dict[str, Any]:
+    manifest_path = get_manifest_path()
+    if not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read index manifest, ignoring it: {e}")
+        return {}
+
+
+def save_manifest(manifest: Dict[str, Any]):
+    os.makedirs(CHROMA_PERSIST_DIR, exist_ok=True)
+    manifest_path = get_manifest_path()
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _is_current_entry(source_key: str, entry: Dict[str, Any], content_hash: str) -> bool:
+    return (entry.get("index_version") == build_index_version(content_hash)
+            and entry.get("collection_name") == get_collection_name(source_key))
+
+
+def find_index_entry(source_key: str, content_hash: str) -> Optional[Dict[str, Any]]:
+    entry = load_manifest().get(source_key)
+    if entry is None or not _is_current_entry(source_key, entry, content_hash):
+        return None
+    return entry
+
+
+def get_source_entry(source_key: str) -> Optional[Dict[str, Any]]:
+    entry = load_manifest().get(source_key)
+    if entry is None or not _is_current_entry(source_key, entry, entry.get("content_hash", "")):
+        return None
+    return entry
+
+
+def get_corpus_entries() -> Dict[str, Dict[str, Any]]:
+    return {
+        source_key: entry for source_key, entry in load_manifest().items()
+        if entry.get("collection_name") == CORPUS_COLLECTION_NAME
+        and _is_current_entry(source_key, entry, entry.get("content_hash", ""))
+    }
+
+
+def build_corpus_version(entries: Dict[str, Dict[str, Any]], where: Optional[Dict[str, Any]] = None) -> str:
+    """Changes whenever a corpus source is added, removed or re-indexed, or the query filter changes."""
+    payload = json.dumps({
+        "sources": sorted((source_key, entry["index_version"]) for source_key, entry in entries.items()),
+        "where": where,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def record_index_entry(source_key: str, content_hash: str, chunk_count: int,
+                       file_name: Optional[str] = None, file_type: Optional[str] = None) -> Dict[str, Any]:
+    manifest = load_manifest()
+    entry = {
+        "collection_name": get_collection_name(source_key),
+        "content_hash": content_hash,
+        "index_version": build_index_version(content_hash),
+        "chunk_count": chunk_count,
+        "file_name": file_name,
+        "file_type": file_type,
+        "created_at": time.time(),
+        **get_index_params(),
+    }
+    manifest[source_key] = entry
+    save_manifest(manifest)
+    return entry
+
+
+def remove_index_entry(source_key: str):
+    manifest = load_manifest()
+    if manifest.pop(source_key, None) is not None:
+        save_manifest(manifest)
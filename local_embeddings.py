@@ -0,0 +1,64 @@
+import os
+from functools import cached_property
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+
+class OnnxMiniLMEmbeddings(Embeddings):
+    """all-MiniLM-L6-v2 on onnxruntime (CPU), reusing the model download and tokenizer bundled with Chroma."""
+
+    def __init__(self, batch_size: int = 32, num_threads: int = 1):
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self._model = _create_onnx_model(num_threads)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._model(texts[start:start + self.batch_size]))
+        return [list(map(float, vector)) for vector in vectors]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class SentenceTransformerEmbeddings(Embeddings):
+    """Any sentence-transformers model on CPU, encoded in fixed-size batches with a capped torch thread pool."""
+
+    def __init__(self, model_name: str, batch_size: int = 32, num_threads: int = 1):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        torch.set_num_threads(num_threads)
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.model.encode(texts, batch_size=self.batch_size, normalize_embeddings=True, show_progress_bar=False)
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def _create_onnx_model(num_threads: int):
+    from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+
+    class ThreadLimitedONNXMiniLM(ONNXMiniLM_L6_V2):
+        # Chroma builds the session with onnxruntime's default (all cores) thread pool
+        @cached_property
+        def model(self):
+            self._download_model_if_not_exists()
+            options = self.ort.SessionOptions()
+            options.log_severity_level = 3
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+            options.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            return self.ort.InferenceSession(
+                os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME, "model.onnx"),
+                sess_options=options,
+                providers=["CPUExecutionProvider"]
+            )
+
+    return ThreadLimitedONNXMiniLM(preferred_providers=["CPUExecutionProvider"])
@@ -1,5 +1,11 @@
+import csv
+import io
 import os
-from typing import List, Dict, Any, Union
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Iterator, Optional, Union
 from pathlib import Path
 import logging
 
@@ -12,9 +18,24 @@ from langchain_community.document_loaders import (
     TextLoader
 )
 
+from config import LOADER_MAX_WORKERS, LOADER_FILE_TIMEOUT_SECONDS
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _get_pdf_reader_class():
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        from PyPDF2 import PdfReader
+    return PdfReader
+
+
+def _load_document_in_worker(file_path: str) -> List[Document]:
+    return MultiFormatDocumentLoader().load_document(file_path)
+
+
 class MultiFormatDocumentLoader:
     
     def __init__(self):
@@ -34,6 +55,8 @@ class MultiFormatDocumentLoader:
         }
         
         self.text_formats = {"txt", "md", "py", "js", "html", "xml", "json", "yaml", "yml"}
+        self.in_memory_formats = {"pdf", "docx", "csv"} | (self.text_formats & set(self.loaders))
+        self.last_failed_files = []
     
     def get_file_extension(self, file_path: Union[str, Path]) -> str:
         return Path(file_path).suffix[1:].lower()
@@ -44,34 +67,13 @@ class MultiFormatDocumentLoader:
     
     def load_document(self, file_path: Union[str, Path]) -> List[Document]:
         file_path = Path(file_path)
-        
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        extension = self.get_file_extension(file_path)
-        
-        if not self.is_supported_format(file_path):
-            raise ValueError(f"Unsupported file type: {extension}")
-        
-        logger.info(f"Loading document: {file_path} (format: {extension})")
+        loader, extension = self._create_loader(file_path)
         
         try:
-            loader_class = self.loaders[extension]
-            
-            if extension in ["csv"]:
-                loader = loader_class(str(file_path), encoding="utf-8")
-            else:
-                loader = loader_class(str(file_path))
-            
             documents = loader.load()
             
             for doc in documents:
-                doc.metadata.update({
-                    "source": str(file_path),
-                    "file_type": extension,
-                    "file_name": file_path.name,
-                    "file_size": file_path.stat().st_size if file_path.exists() else 0,
-                })
+                self._add_file_metadata(doc, file_path, extension)
             
             logger.info(f"Successfully loaded {len(documents)} document chunks from {file_path}")
             return documents
@@ -80,23 +82,243 @@ class MultiFormatDocumentLoader:
             logger.error(f"Error loading document {file_path}: {str(e)}")
             raise Exception(f"Failed to load document {file_path}: {str(e)}")
     
-    def load_multiple_documents(self, file_paths: List[Union[str, Path]]) -> List[Document]:
+    def lazy_load_document(self, file_path: Union[str, Path]) -> Iterator[Document]:
+        """Yields the document page by page (or row by row) instead of materialising it."""
+        file_path = Path(file_path)
+        loader, extension = self._create_loader(file_path)
+        
+        loaded_count = 0
+        try:
+            for doc in loader.lazy_load():
+                self._add_file_metadata(doc, file_path, extension)
+                loaded_count += 1
+                yield doc
+        except Exception as e:
+            logger.error(f"Error loading document {file_path}: {str(e)}")
+            raise Exception(f"Failed to load document {file_path}: {str(e)}")
+        
+        logger.info(f"Successfully streamed {loaded_count} document chunks from {file_path}")
+    
+    def can_load_from_bytes(self, file_name: str) -> bool:
+        return self.get_file_extension(file_name) in self.in_memory_formats
+    
+    def lazy_load_bytes(self, data, file_name: str) -> Iterator[Document]:
+        """Parses an in-memory file without writing it to disk; only in_memory_formats are supported."""
+        extension = self.get_file_extension(file_name)
+        if extension not in self.in_memory_formats:
+            raise ValueError(f"In-memory loading not supported for: {extension}")
+        
+        buffer = memoryview(data)
+        logger.info(f"Loading document from memory: {file_name} (format: {extension})")
+        
+        loaded_count = 0
+        try:
+            for content, metadata in self._parse_buffer(buffer, extension):
+                metadata.update({
+                    "source": file_name,
+                    "file_type": extension,
+                    "file_name": file_name,
+                    "file_size": buffer.nbytes,
+                })
+                loaded_count += 1
+                yield Document(page_content=content, metadata=metadata)
+        except Exception as e:
+            logger.error(f"Error loading document {file_name}: {str(e)}")
+            raise Exception(f"Failed to load document {file_name}: {str(e)}")
+        
+        logger.info(f"Successfully loaded {loaded_count} document chunks from memory for {file_name}")
+    
+    def _parse_buffer(self, buffer: memoryview, extension: str):
+        # Mirrors the content and metadata layout of the path-based langchain loaders
+        if extension == "pdf":
+            reader = _get_pdf_reader_class()(self._open_buffer(buffer))
+            for page_number, page in enumerate(reader.pages):
+                yield page.extract_text(), {"page": page_number}
+        elif extension == "docx":
+            import docx2txt
+            yield docx2txt.process(self._open_buffer(buffer)), {}
+        elif extension == "csv":
+            text_stream = io.TextIOWrapper(self._open_buffer(buffer), encoding="utf-8", newline="")
+            for row_number, row in enumerate(csv.DictReader(text_stream)):
+                content = "\n".join(
+                    f"{key.strip() if key is not None else key}: {value.strip() if isinstance(value, str) else value}"
+                    for key, value in row.items()
+                )
+                yield content, {"row": row_number}
+        else:
+            yield str(buffer, "utf-8"), {}
+    
+    def _open_buffer(self, buffer: memoryview) -> io.BytesIO:
+        # BytesIO shares an immutable bytes object instead of copying it
+        return io.BytesIO(buffer.obj if isinstance(buffer.obj, bytes) else buffer)
+    
+    def estimate_page_count(self, file_path: Union[str, Path], data=None) -> Optional[int]:
+        """Returns the PDF page count (reading the in-memory data when given), or None when it cannot be known cheaply."""
+        if self.get_file_extension(file_path) != "pdf":
+            return None
+        try:
+            source = self._open_buffer(memoryview(data)) if data is not None else str(file_path)
+            return len(_get_pdf_reader_class()(source).pages)
+        except Exception as e:
+            logger.info(f"Could not estimate page count for {file_path}: {str(e)}")
+            return None
+    
+    def _create_loader(self, file_path: Path):
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        
+        extension = self.get_file_extension(file_path)
+        
+        if not self.is_supported_format(file_path):
+            raise ValueError(f"Unsupported file type: {extension}")
+        
+        logger.info(f"Loading document: {file_path} (format: {extension})")
+        
+        loader_class = self.loaders[extension]
+        
+        if extension in ["csv"]:
+            return loader_class(str(file_path), encoding="utf-8"), extension
+        return loader_class(str(file_path)), extension
+    
+    def _add_file_metadata(self, doc: Document, file_path: Path, extension: str):
+        doc.metadata.update({
+            "source": str(file_path),
+            "file_type": extension,
+            "file_name": file_path.name,
+            "file_size": file_path.stat().st_size if file_path.exists() else 0,
+        })
+    
+    def load_multiple_documents(self, file_paths: List[Union[str, Path]], max_workers: Optional[int] = None,
+                                timeout: Optional[float] = None) -> List[Document]:
+        results, failed_files = self.load_files(file_paths, max_workers=max_workers, timeout=timeout)
+        
         all_documents = []
+        for index in range(len(file_paths)):
+            all_documents.extend(results.get(index, []))
+        
+        self.last_failed_files = failed_files
+        if failed_files:
+            logger.warning(f"Failed to load {len(failed_files)} files: {failed_files}")
+        
+        logger.info(f"Successfully loaded {len(all_documents)} total document chunks from {len(file_paths) - len(failed_files)} files")
+        return all_documents
+    
+    def load_files(self, file_paths: List[Union[str, Path]], max_workers: Optional[int] = None,
+                   timeout: Optional[float] = None):
+        """Loads each file, returning ({input_index: documents}, failed_file_paths)."""
+        max_workers = LOADER_MAX_WORKERS if max_workers is None else max_workers
+        timeout = LOADER_FILE_TIMEOUT_SECONDS if timeout is None else timeout
+        
+        if max_workers > 1 and len(file_paths) > 1:
+            return self._load_in_process_pool(file_paths, max_workers, timeout)
+        return self._load_sequentially(file_paths)
+    
+    def _load_sequentially(self, file_paths):
+        results = {}
         failed_files = []
         
-        for file_path in file_paths:
+        for index, file_path in enumerate(file_paths):
             try:
-                documents = self.load_document(file_path)
-                all_documents.extend(documents)
+                results[index] = self.load_document(file_path)
             except Exception as e:
                 logger.warning(f"Failed to load {file_path}: {str(e)}")
                 failed_files.append(str(file_path))
         
-        if failed_files:
-            logger.warning(f"Failed to load {len(failed_files)} files: {failed_files}")
+        return results, failed_files
+    
+    def _load_in_process_pool(self, file_paths, max_workers, timeout):
+        results = {}
+        failed_files = []
+        pending = list(enumerate(file_paths))
+        running = {}
+        # Files in flight when a worker died; each is retried alone so only the one that kills its worker fails
+        suspects = set()
+        worker_count = min(max_workers, len(file_paths))
         
-        logger.info(f"Successfully loaded {len(all_documents)} total document chunks from {len(file_paths) - len(failed_files)} files")
-        return all_documents
+        logger.info(f"Loading {len(file_paths)} files with {worker_count} worker processes")
+        
+        executor = self._create_process_pool(worker_count)
+        try:
+            while pending or running:
+                # Only keep as many files in flight as there are workers, so each deadline starts when the file does
+                pool_broken = False
+                while pending and len(running) < worker_count:
+                    index, file_path = pending[0]
+                    running_suspect = any(entry[0] in suspects for entry in running.values())
+                    if running_suspect or (index in suspects and running):
+                        break
+                    try:
+                        future = executor.submit(_load_document_in_worker, str(file_path))
+                    except BrokenProcessPool:
+                        pool_broken = True
+                        break
+                    pending.pop(0)
+                    running[future] = (index, file_path, time.monotonic() + timeout)
+                    if index in suspects:
+                        break
+                
+                if running and not pool_broken:
+                    next_deadline = min(deadline for _, _, deadline in running.values())
+                    done, _ = wait(running, timeout=max(0.0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                    
+                    for future in done:
+                        try:
+                            result = future.result()
+                        except BrokenProcessPool:
+                            pool_broken = True
+                            continue
+                        except Exception as e:
+                            index, file_path, _ = running.pop(future)
+                            suspects.discard(index)
+                            logger.warning(f"Failed to load {file_path}: {str(e)}")
+                            failed_files.append(str(file_path))
+                            continue
+                        index, _, _ = running.pop(future)
+                        suspects.discard(index)
+                        results[index] = result
+                
+                if pool_broken:
+                    crashed = [(index, file_path) for index, file_path, _ in running.values()]
+                    if len(crashed) == 1:
+                        index, file_path = crashed[0]
+                        suspects.discard(index)
+                        logger.warning(f"Worker process died while loading {file_path}")
+                        failed_files.append(str(file_path))
+                    else:
+                        logger.warning(f"A worker process died with {len(crashed)} files in flight - retrying them one at a time")
+                        suspects.update(index for index, _ in crashed)
+                        pending = crashed + pending
+                    running = {}
+                    self._terminate_process_pool(executor)
+                    executor = self._create_process_pool(worker_count)
+                    continue
+                
+                now = time.monotonic()
+                expired = [future for future, (_, _, deadline) in running.items() if deadline <= now]
+                if expired:
+                    for future in expired:
+                        index, file_path, _ = running.pop(future)
+                        suspects.discard(index)
+                        logger.warning(f"Timed out loading {file_path} after {timeout}s")
+                        failed_files.append(str(file_path))
+                    
+                    # A stuck worker cannot be cancelled, so replace the pool and restart the files still in flight
+                    pending = [(index, file_path) for index, file_path, _ in running.values()] + pending
+                    running = {}
+                    self._terminate_process_pool(executor)
+                    executor = self._create_process_pool(worker_count)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+        
+        return results, failed_files
+    
+    def _create_process_pool(self, worker_count):
+        return ProcessPoolExecutor(max_workers=worker_count, mp_context=multiprocessing.get_context("spawn"))
+    
+    def _terminate_process_pool(self, executor):
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
     
     def load_directory(self, directory_path: Union[str, Path], recursive: bool = True) -> List[Document]:
         directory_path = Path(directory_path)
@@ -1,34 +1,56 @@
-import streamlit as st
+import asyncio
 
 from langgraph.graph import END, StateGraph
 from langchain_core.documents import Document
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from answer_cache import AnswerCache
+from config import (
+    GRADING_MAX_CONCURRENCY, GRADING_MODE, VALIDATION_MODE, RERANK_ENABLED, RERANK_TOP_N,
+    GRADING_GATE_ENABLED, GRADING_GATE_THRESHOLDS,
+    ANSWER_CACHE_ENABLED, ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_TTL_SECONDS, ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    RETRIEVAL_CACHE_ENABLED, RETRIEVAL_CACHE_MAX_ENTRIES
+)
+from embeddings import get_embedding_function
+from reranker import get_reranker, get_scorer_name, rerank_documents
+from resource_registry import get_shared_graph, get_shared_resource
+from retrieval_cache import RetrievalCache
 from state import GraphState
-from chains.evaluate import evaluate_docs
+from chains.evaluate import evaluate_docs, listwise_evaluate_docs, format_documents_for_listwise, GatedEvaluateDocs
 from chains.generate_answer import generate_chain
 from chains.question_relevance import question_relevance
 from chains.document_relevance import document_relevance
 
+MAX_RETRIES = 3
+
+# Copies the caller's contextvars on submit, so the validators stay children of the graph run (callbacks, tracing)
+_validation_executor = ContextThreadPoolExecutor(max_workers=8, thread_name_prefix="answer-validation")
+
+
 class RAGWorkflow:
     
     def __init__(self):
         self.graph = None
         self.retriever = None
-        self._current_session_retriever_key = None
+        self.index_version = None
 
     def get_graph(self):
-        if 'graph_instance' not in st.session_state or st.session_state.graph_instance is None:
-            st.session_state.graph_instance = self._create_graph()
-        return st.session_state.graph_instance
+        if self.graph is None:
+            self.graph = get_shared_graph("rag_workflow", self._create_graph)
+        return self.graph
 
     def _create_graph(self):
         workflow = StateGraph(GraphState)
         
-        workflow.add_node("Retrieve Documents", self._retrieve)
-        workflow.add_node("Grade Documents", self._evaluate)
-        workflow.add_node("Generate Answer", self._generate_answer)
+        workflow.add_node("Retrieve Documents", RunnableLambda(self._retrieve, afunc=self._aretrieve))
+        workflow.add_node("Rerank Documents", RunnableLambda(self._rerank, afunc=self._arerank))
+        workflow.add_node("Grade Documents", RunnableLambda(self._evaluate, afunc=self._aevaluate))
+        workflow.add_node("Generate Answer", RunnableLambda(self._generate_answer, afunc=self._agenerate_answer))
+        workflow.add_node("Validate Answer", RunnableLambda(self._validate_answer, afunc=self._avalidate_answer))
 
         workflow.set_entry_point("Retrieve Documents")
-        workflow.add_edge("Retrieve Documents", "Grade Documents")
+        workflow.add_edge("Retrieve Documents", "Rerank Documents")
+        workflow.add_edge("Rerank Documents", "Grade Documents")
         workflow.add_conditional_edges(
             "Grade Documents",
             self._any_doc_irrelevant,
@@ -37,8 +59,9 @@ class RAGWorkflow:
             },
         )
 
+        workflow.add_edge("Generate Answer", "Validate Answer")
         workflow.add_conditional_edges(
-            "Generate Answer",
+            "Validate Answer",
             self._check_hallucinations,
             {
                 "Hallucinations detected": "Generate Answer",
@@ -47,62 +70,202 @@ class RAGWorkflow:
             },
         )
 
-        workflow.add_edge("Generate Answer", END)
-
         return workflow.compile()
     
-    def _retrieve(self, state: GraphState):
+    def _retrieve(self, state: GraphState, config: RunnableConfig):
         print("GRAPH STATE: Retrieve Documents")
         question = state["question"]
+        current_retriever = config.get("configurable", {}).get("retriever")
+        
+        print(f"Current retriever status: {current_retriever is not None}")
+        
+        if current_retriever is None:
+            print("No retriever available - going to online search")
+            return self._retrieval_fallback(question)
+        
+        index_version = config.get("configurable", {}).get("index_version")
+        documents = self._lookup_cached_documents(index_version, question)
+        if documents is not None:
+            return self._retrieval_result(question, documents)
         
-        retry_count = 0
+        try:
+            documents = current_retriever.invoke(question)
+        except Exception as e:
+            print(f"Error retrieving documents: {e}")
+            return self._retrieval_fallback(question, config=config)
         
-        current_retriever = self.get_current_retriever()
+        self._store_cached_documents(index_version, question, documents)
+        return self._retrieval_result(question, documents)
+    
+    async def _aretrieve(self, state: GraphState, config: RunnableConfig):
+        print("GRAPH STATE: Retrieve Documents (async)")
+        question = state["question"]
+        current_retriever = config.get("configurable", {}).get("retriever")
         
         print(f"Current retriever status: {current_retriever is not None}")
         
         if current_retriever is None:
             print("No retriever available - going to online search")
-            return {
-                "documents": [], 
-                "question": question, 
-                "online_search": True,
-                "retry_count": retry_count
-            }
+            return self._retrieval_fallback(question)
+        
+        index_version = config.get("configurable", {}).get("index_version")
+        documents = self._lookup_cached_documents(index_version, question)
+        if documents is not None:
+            return self._retrieval_result(question, documents)
         
         try:
-            documents = current_retriever.invoke(question)
-            print(f"Retrieved {len(documents)} documents from ChromaDB")
-            return {
-                "documents": documents, 
-                "question": question,
-                "retry_count": retry_count
-            }
+            documents = await current_retriever.ainvoke(question)
         except Exception as e:
             print(f"Error retrieving documents: {e}")
+            return self._retrieval_fallback(question, config=config)
+        
+        self._store_cached_documents(index_version, question, documents)
+        return self._retrieval_result(question, documents)
+    
+    def _get_retrieval_cache(self):
+        return get_shared_resource("retrieval_cache", "default", lambda: RetrievalCache(
+            max_entries=RETRIEVAL_CACHE_MAX_ENTRIES
+        ))
+    
+    def _lookup_cached_documents(self, index_version, question):
+        if not RETRIEVAL_CACHE_ENABLED or index_version is None:
+            return None
+        return self._get_retrieval_cache().get(index_version, question)
+    
+    def _store_cached_documents(self, index_version, question, documents):
+        if RETRIEVAL_CACHE_ENABLED and index_version is not None:
+            self._get_retrieval_cache().put(index_version, question, documents)
+    
+    def _retrieval_result(self, question, documents):
+        print(f"Retrieved {len(documents)} documents from ChromaDB")
+        return {
+            "documents": documents, 
+            "question": question,
+            "retry_count": 0
+        }
+    
+    def _retrieval_fallback(self, question, config=None):
+        on_retriever_error = (config or {}).get("configurable", {}).get("on_retriever_error")
+        if on_retriever_error is not None:
             print("Clearing invalid retriever and falling back to online search")
-            self.retriever = None
-            st.session_state.retriever = None
-            return {
-                "documents": [], 
-                "question": question, 
-                "online_search": True,
-                "retry_count": retry_count
-            }
+            on_retriever_error()
+        return {
+            "documents": [], 
+            "question": question, 
+            "online_search": True,
+            "retry_count": 0
+        }
+    
+    def _rerank(self, state: GraphState):
+        print("GRAPH STATE: Rerank Documents")
+        if not RERANK_ENABLED or not state["documents"]:
+            return {}
+        return self._rerank_result(state["question"], state["documents"])
+    
+    async def _arerank(self, state: GraphState):
+        print("GRAPH STATE: Rerank Documents (async)")
+        if not RERANK_ENABLED or not state["documents"]:
+            return {}
+        return await asyncio.to_thread(self._rerank_result, state["question"], state["documents"])
+    
+    def _rerank_result(self, question, documents):
+        try:
+            reranked_docs, rerank_scores = rerank_documents(get_reranker(), question, documents, RERANK_TOP_N)
+        except Exception as e:
+            print(f"Reranking failed, grading the first {RERANK_TOP_N} retrieved documents: {e}")
+            return {"documents": documents[:RERANK_TOP_N], "rerank_scores": None}
+        
+        print(f"Reranked {len(documents)} documents, sending top {len(reranked_docs)} to grading "
+              f"(scores: {', '.join(f'{score:.3f}' for score in rerank_scores)})")
+        return {"documents": reranked_docs, "rerank_scores": rerank_scores}
     
     def _evaluate(self, state: GraphState):
         print("GRAPH STATE: Grade Documents")
         question = state["question"]
         documents = state["documents"]
-
+        print(f"Evaluating {len(documents)} documents, online_search: {state.get('online_search', False)}")
+        
+        decisions, similarities, thresholds = self._gate_documents(state)
+        llm_documents = [document for document, decision in zip(documents, decisions) if decision == "llm"]
+        if GRADING_MODE == "listwise" and llm_documents:
+            responses = self._grade_documents_listwise(question, llm_documents)
+        else:
+            responses = self._grade_documents(question, llm_documents)
+        
+        return self._apply_document_evaluations(state, self._merge_gated_evaluations(decisions, similarities, thresholds, responses))
+    
+    async def _aevaluate(self, state: GraphState):
+        print("GRAPH STATE: Grade Documents (async)")
+        question = state["question"]
+        documents = state["documents"]
+        print(f"Evaluating {len(documents)} documents, online_search: {state.get('online_search', False)}")
+        
+        decisions, similarities, thresholds = self._gate_documents(state)
+        llm_documents = [document for document, decision in zip(documents, decisions) if decision == "llm"]
+        if GRADING_MODE == "listwise" and llm_documents:
+            responses = await self._agrade_documents_listwise(question, llm_documents)
+        else:
+            responses = await self._agrade_documents(question, llm_documents)
+        
+        return self._apply_document_evaluations(state, self._merge_gated_evaluations(decisions, similarities, thresholds, responses))
+    
+    def _gate_documents(self, state):
+        """Decides per document whether the rerank score alone settles relevance or the LLM grader must decide."""
+        documents = state["documents"]
+        similarities = state.get("rerank_scores")
+        thresholds = GRADING_GATE_THRESHOLDS.get(get_scorer_name()) if GRADING_GATE_ENABLED else None
+        if thresholds is None or similarities is None or len(similarities) != len(documents):
+            return ["llm"] * len(documents), [None] * len(documents), None
+        
+        decisions = []
+        for similarity in similarities:
+            if similarity >= thresholds["accept"]:
+                decisions.append("auto_accept")
+            elif similarity < thresholds["reject"]:
+                decisions.append("auto_reject")
+            else:
+                decisions.append("llm")
+        
+        print(f"Similarity gate [{thresholds['reject']}, {thresholds['accept']}) for {get_scorer_name()}: "
+              f"{decisions.count('auto_accept')} auto-accepted, {decisions.count('auto_reject')} auto-rejected, "
+              f"{decisions.count('llm')} sent to LLM grading")
+        return decisions, similarities, thresholds
+    
+    def _merge_gated_evaluations(self, decisions, similarities, thresholds, llm_responses):
+        llm_responses = iter(llm_responses)
+        evaluations = []
+        for decision, similarity in zip(decisions, similarities):
+            gate = {
+                "grading_decision": decision,
+                "similarity": similarity,
+                "accept_threshold": thresholds["accept"] if thresholds else None,
+                "reject_threshold": thresholds["reject"] if thresholds else None,
+            }
+            if decision == "llm":
+                evaluations.append(GatedEvaluateDocs(**next(llm_responses).model_dump(), **gate))
+                continue
+            
+            accepted = decision == "auto_accept"
+            evaluations.append(GatedEvaluateDocs(
+                score="yes" if accepted else "no",
+                relevance_score=min(max(similarity, 0.0), 1.0),
+                coverage_assessment=(
+                    f"Aceito automaticamente: similaridade {similarity:.3f} >= {thresholds['accept']}" if accepted
+                    else f"Rejeitado automaticamente: similaridade {similarity:.3f} < {thresholds['reject']}"
+                ),
+                **gate
+            ))
+        return evaluations
+    
+    def _apply_document_evaluations(self, state, responses):
+        question = state["question"]
+        documents = state["documents"]
         online_search = state.get("online_search", False)
-        print(f"Evaluating {len(documents)} documents, online_search: {online_search}")
         
         filtered_docs = []
         document_evaluations = []
         
-        for document in documents:
-            response = evaluate_docs.invoke({"question": question, "document": document.page_content})
+        for document, response in zip(documents, responses):
             document_evaluations.append(response)
             
             result = response.score
@@ -123,28 +286,66 @@ class RAGWorkflow:
             "document_evaluations": document_evaluations
         }
     
-    def set_retriever(self, retriever):
+    def _grade_documents(self, question, documents):
+        return evaluate_docs.batch(
+            self._grading_inputs(question, documents),
+            config={"max_concurrency": GRADING_MAX_CONCURRENCY}
+        )
+    
+    async def _agrade_documents(self, question, documents):
+        return await evaluate_docs.abatch(
+            self._grading_inputs(question, documents),
+            config={"max_concurrency": GRADING_MAX_CONCURRENCY}
+        )
+    
+    def _grading_inputs(self, question, documents):
+        return [{"question": question, "document": document.page_content} for document in documents]
+    
+    def _grade_documents_listwise(self, question, documents):
+        response = listwise_evaluate_docs.invoke(self._listwise_grading_input(question, documents))
+        evaluations_by_index, missing_indexes = self._index_listwise_evaluations(response, documents)
+        if missing_indexes:
+            fallback_responses = self._grade_documents(question, [documents[i] for i in missing_indexes])
+            evaluations_by_index.update(zip(missing_indexes, fallback_responses))
+        return [evaluations_by_index[i] for i in range(len(documents))]
+    
+    async def _agrade_documents_listwise(self, question, documents):
+        response = await listwise_evaluate_docs.ainvoke(self._listwise_grading_input(question, documents))
+        evaluations_by_index, missing_indexes = self._index_listwise_evaluations(response, documents)
+        if missing_indexes:
+            fallback_responses = await self._agrade_documents(question, [documents[i] for i in missing_indexes])
+            evaluations_by_index.update(zip(missing_indexes, fallback_responses))
+        return [evaluations_by_index[i] for i in range(len(documents))]
+    
+    def _listwise_grading_input(self, question, documents):
+        return {
+            "question": question,
+            "documents": format_documents_for_listwise(documents),
+            "document_count": len(documents)
+        }
+    
+    def _index_listwise_evaluations(self, response, documents):
+        evaluations_by_index = {}
+        for evaluation in response.evaluations:
+            if 0 <= evaluation.document_index < len(documents):
+                evaluations_by_index.setdefault(evaluation.document_index, evaluation)
+        
+        missing_indexes = [i for i in range(len(documents)) if i not in evaluations_by_index]
+        if missing_indexes:
+            print(f"Listwise grading missed documents {missing_indexes} - grading them individually")
+        return evaluations_by_index, missing_indexes
+    
+    def set_retriever(self, retriever, index_version=None):
         self.retriever = retriever
+        self.index_version = index_version if retriever is not None else None
         
         if retriever is not None:
-            current_file_key = st.session_state.get('processed_file')
-            self._current_session_retriever_key = current_file_key
-            print(f"Retriever set for file: {current_file_key}")
+            print(f"Retriever set for index version: {index_version}")
         else:
-            self._current_session_retriever_key = None
             print("Retriever cleared")
 
     def get_current_retriever(self):
-        if self.retriever is not None:
-            return self.retriever
-            
-        session_retriever = st.session_state.get('retriever')
-        if session_retriever is not None:
-            print("Using retriever from session state")
-            self.retriever = session_retriever
-            return session_retriever
-            
-        return None
+        return self.retriever
     
     def _any_doc_irrelevant(self, state):
         next_state = "Generate Answer"
@@ -154,23 +355,31 @@ class RAGWorkflow:
         print("GRAPH STATE: Generate Answer")
         question = state["question"]
         documents = state["documents"]
-        
         retry_count = state.get("retry_count", 0)
         
         print(f"Generating answer using {len(documents)} documents (attempt {retry_count + 1})")
         
         if len(documents) == 0:
-            print("No relevant documents found - providing fallback response")
-            solution = self._generate_fallback_response(question)
-            return {
-                "documents": documents, 
-                "question": question, 
-                "solution": solution,
-                "retry_count": retry_count + 1,
-                "no_documents_available": True
-            }
+            return self._fallback_answer(question, documents, retry_count)
         
         solution = generate_chain.invoke({"context": documents, "question": question})
+        return self._answer_result(question, documents, solution, retry_count)
+    
+    async def _agenerate_answer(self, state: GraphState):
+        print("GRAPH STATE: Generate Answer (async)")
+        question = state["question"]
+        documents = state["documents"]
+        retry_count = state.get("retry_count", 0)
+        
+        print(f"Generating answer using {len(documents)} documents (attempt {retry_count + 1})")
+        
+        if len(documents) == 0:
+            return self._fallback_answer(question, documents, retry_count)
+        
+        solution = await generate_chain.ainvoke({"context": documents, "question": question})
+        return self._answer_result(question, documents, solution, retry_count)
+    
+    def _answer_result(self, question, documents, solution, retry_count):
         print(f"Answer generated: {len(solution)} characters")
         return {
             "documents": documents, 
@@ -179,6 +388,16 @@ class RAGWorkflow:
             "retry_count": retry_count + 1
         }
     
+    def _fallback_answer(self, question, documents, retry_count):
+        print("No relevant documents found - providing fallback response")
+        return {
+            "documents": documents, 
+            "question": question, 
+            "solution": self._generate_fallback_response(question),
+            "retry_count": retry_count + 1,
+            "no_documents_available": True
+        }
+    
     def _generate_fallback_response(self, question):
         fallback_message = f"""Desculpe, mas não consegui encontrar informações relevantes nos documentos carregados para responder à sua pergunta: "{question}".
 
@@ -192,56 +411,266 @@ Você poderia reformular sua pergunta de forma mais específica sobre o conteúd
         
         return fallback_message
     
-    def process_question(self, question):
+    def process_question(self, question, use_answer_cache=True):
+        # Stays on the sync nodes: the module-level chat models keep async clients bound to the loop that first
+        # used them, so a fresh asyncio.run per question would reuse connections of a closed loop
+        print(f"STARTING RAG WORKFLOW for question: '{question}'")
+        
+        index_version = self.get_current_index_version()
+        if use_answer_cache:
+            cached_result, question_embedding = self._lookup_cached_answer(index_version, question)
+            if cached_result is not None:
+                print(f"RAG WORKFLOW SERVED FROM ANSWER CACHE ({cached_result['answer_cache_hit']})")
+                return cached_result
+        
+        graph = self.get_graph()
+        result = graph.invoke(input={"question": question}, config=self._build_run_config())
+        if use_answer_cache:
+            self._store_cached_answer(index_version, question, result, question_embedding)
+        
+        print(f"RAG WORKFLOW COMPLETED")
+        return result
+    
+    async def aprocess_question(self, question, use_answer_cache=True):
         print(f"STARTING RAG WORKFLOW for question: '{question}'")
         
-        current_retriever = self.get_current_retriever()
-        self.set_retriever(current_retriever)
+        index_version = self.get_current_index_version()
+        if use_answer_cache:
+            cached_result, question_embedding = await asyncio.to_thread(
+                self._lookup_cached_answer, index_version, question
+            )
+            if cached_result is not None:
+                print(f"RAG WORKFLOW SERVED FROM ANSWER CACHE ({cached_result['answer_cache_hit']})")
+                return cached_result
         
         graph = self.get_graph()
-        result = graph.invoke(input={"question": question})
+        result = await graph.ainvoke(input={"question": question}, config=self._build_run_config())
+        if use_answer_cache:
+            await asyncio.to_thread(self._store_cached_answer, index_version, question, result, question_embedding)
         
         print(f"RAG WORKFLOW COMPLETED")
         return result
     
+    def stream_question(self, question):
+        """Runs the workflow yielding ("token", text), ("node", (node_name, update)) and finally ("result", state)."""
+        print(f"STARTING STREAMING RAG WORKFLOW for question: '{question}'")
+        
+        index_version = self.get_current_index_version()
+        cached_result, question_embedding = self._lookup_cached_answer(index_version, question)
+        if cached_result is not None:
+            print(f"STREAMING RAG WORKFLOW SERVED FROM ANSWER CACHE ({cached_result['answer_cache_hit']})")
+            yield "result", cached_result
+            return
+        
+        graph = self.get_graph()
+        result = None
+        for stream_mode, payload in graph.stream(
+            input={"question": question},
+            config=self._build_run_config(),
+            stream_mode=["messages", "updates", "values"]
+        ):
+            if stream_mode == "values":
+                result = payload
+            yield from self._translate_stream_chunk(stream_mode, payload)
+        
+        self._store_cached_answer(index_version, question, result, question_embedding)
+        print(f"STREAMING RAG WORKFLOW COMPLETED")
+        yield "result", result
+    
+    async def astream_question(self, question):
+        """Async counterpart of stream_question, driving the graph with astream."""
+        print(f"STARTING ASYNC STREAMING RAG WORKFLOW for question: '{question}'")
+        
+        index_version = self.get_current_index_version()
+        cached_result, question_embedding = await asyncio.to_thread(
+            self._lookup_cached_answer, index_version, question
+        )
+        if cached_result is not None:
+            print(f"ASYNC STREAMING RAG WORKFLOW SERVED FROM ANSWER CACHE ({cached_result['answer_cache_hit']})")
+            yield "result", cached_result
+            return
+        
+        graph = self.get_graph()
+        result = None
+        async for stream_mode, payload in graph.astream(
+            input={"question": question},
+            config=self._build_run_config(),
+            stream_mode=["messages", "updates", "values"]
+        ):
+            if stream_mode == "values":
+                result = payload
+            for event in self._translate_stream_chunk(stream_mode, payload):
+                yield event
+        
+        await asyncio.to_thread(self._store_cached_answer, index_version, question, result, question_embedding)
+        print(f"ASYNC STREAMING RAG WORKFLOW COMPLETED")
+        yield "result", result
+    
+    def _translate_stream_chunk(self, stream_mode, payload):
+        if stream_mode == "messages":
+            message_chunk, metadata = payload
+            if metadata.get("langgraph_node") == "Generate Answer" and message_chunk.content:
+                yield "token", message_chunk.content
+        elif stream_mode == "updates":
+            for node_name, update in payload.items():
+                yield "node", (node_name, update or {})
+    
+    def get_current_index_version(self):
+        return self.index_version
+    
+    def _get_answer_cache(self):
+        return get_shared_resource("answer_cache", "default", lambda: AnswerCache(
+            embedding_function=get_embedding_function(),
+            max_entries=ANSWER_CACHE_MAX_ENTRIES,
+            ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+            similarity_threshold=ANSWER_CACHE_SIMILARITY_THRESHOLD
+        ))
+    
+    def _lookup_cached_answer(self, index_version, question):
+        if not ANSWER_CACHE_ENABLED or index_version is None:
+            return None, None
+        try:
+            return self._get_answer_cache().get(index_version, question)
+        except Exception as e:
+            print(f"Answer cache lookup failed: {e}")
+            return None, None
+    
+    def _store_cached_answer(self, index_version, question, result, question_embedding):
+        if not ANSWER_CACHE_ENABLED or index_version is None or not result:
+            return
+        question_relevance_score = result.get("question_relevance_score")
+        if question_relevance_score is None or not question_relevance_score.binary_score:
+            return
+        self._get_answer_cache().put(index_version, question, result, question_embedding)
+    
+    def _build_run_config(self):
+        return {"configurable": {"retriever": self.get_current_retriever(), "index_version": self.get_current_index_version()}}
+    
+    def _validate_answer(self, state: GraphState):
+        print("GRAPH STATE: Validate Answer")
+        skipped = self._skip_validation(state)
+        if skipped is not None:
+            return skipped
+        
+        question, documents, solution = state["question"], state["documents"], state["solution"]
+        if VALIDATION_MODE == "parallel":
+            scores = self._run_validations_parallel(question, documents, solution)
+        else:
+            scores = self._run_validations_sequential(question, documents, solution)
+        return self._validation_result(*scores)
+    
+    async def _avalidate_answer(self, state: GraphState):
+        print("GRAPH STATE: Validate Answer (async)")
+        skipped = self._skip_validation(state)
+        if skipped is not None:
+            return skipped
+        
+        question, documents, solution = state["question"], state["documents"], state["solution"]
+        if VALIDATION_MODE == "parallel":
+            scores = await self._arun_validations_parallel(question, documents, solution)
+        else:
+            scores = await self._arun_validations_sequential(question, documents, solution)
+        return self._validation_result(*scores)
+    
+    def _skip_validation(self, state):
+        if state.get("no_documents_available", False) or len(state["documents"]) == 0:
+            print("No documents available - skipping hallucination check")
+            return {}
+        
+        if state.get("retry_count", 0) >= MAX_RETRIES:
+            print(f"Maximum retries ({MAX_RETRIES}) reached - skipping hallucination check")
+            return {"retry_limit_reached": True}
+        
+        return None
+    
+    def _validation_result(self, doc_relevance_score, question_relevance_score):
+        validation = {"document_relevance_score": doc_relevance_score}
+        if question_relevance_score is not None:
+            validation["question_relevance_score"] = question_relevance_score
+        return validation
+    
+    def _run_validations_sequential(self, question, documents, solution):
+        print("Checking document relevance...")
+        doc_relevance_score = document_relevance.invoke({"documents": documents, "solution": solution})
+        if not doc_relevance_score.binary_score:
+            return doc_relevance_score, None
+        
+        print("Document relevance check passed")
+        print("Checking question relevance...")
+        question_relevance_score = question_relevance.invoke({"question": question, "solution": solution})
+        return doc_relevance_score, question_relevance_score
+    
+    async def _arun_validations_sequential(self, question, documents, solution):
+        print("Checking document relevance...")
+        doc_relevance_score = await document_relevance.ainvoke({"documents": documents, "solution": solution})
+        if not doc_relevance_score.binary_score:
+            return doc_relevance_score, None
+        
+        print("Document relevance check passed")
+        print("Checking question relevance...")
+        question_relevance_score = await question_relevance.ainvoke({"question": question, "solution": solution})
+        return doc_relevance_score, question_relevance_score
+    
+    def _run_validations_parallel(self, question, documents, solution):
+        print("Checking document and question relevance in parallel...")
+        doc_future = _validation_executor.submit(
+            document_relevance.invoke, {"documents": documents, "solution": solution}
+        )
+        question_future = _validation_executor.submit(
+            question_relevance.invoke, {"question": question, "solution": solution}
+        )
+        
+        doc_relevance_score = doc_future.result()
+        if not doc_relevance_score.binary_score:
+            question_future.cancel()
+            return doc_relevance_score, None
+        
+        print("Document relevance check passed")
+        return doc_relevance_score, question_future.result()
+    
+    async def _arun_validations_parallel(self, question, documents, solution):
+        print("Checking document and question relevance in parallel...")
+        doc_task = asyncio.create_task(
+            document_relevance.ainvoke({"documents": documents, "solution": solution})
+        )
+        question_task = asyncio.create_task(
+            question_relevance.ainvoke({"question": question, "solution": solution})
+        )
+        
+        try:
+            doc_relevance_score = await doc_task
+        except BaseException:
+            question_task.cancel()
+            raise
+        
+        if not doc_relevance_score.binary_score:
+            question_task.cancel()
+            return doc_relevance_score, None
+        
+        print("Document relevance check passed")
+        return doc_relevance_score, await question_task
+    
     def _check_hallucinations(self, state: GraphState):
         print("GRAPH STATE: Check Hallucinations")
-        question = state["question"]
         documents = state["documents"]
-        solution = state["solution"]
         retry_count = state.get("retry_count", 0)
         no_documents_available = state.get("no_documents_available", False)
 
         if no_documents_available or len(documents) == 0:
-            print("No documents available - skipping hallucination check and ending workflow")
+            print("No documents available - ending workflow")
             return "Question not addressed"
         
-        MAX_RETRIES = 3
-        if retry_count >= MAX_RETRIES:
+        if state.get("retry_limit_reached"):
             print(f"Maximum retries ({MAX_RETRIES}) reached - ending workflow to prevent infinite loop")
-            state["retry_limit_reached"] = True
             return "Question not addressed"
 
-        print("Checking document relevance...")
-        doc_relevance_score = document_relevance.invoke(
-            {"documents": documents, "solution": solution}
-        )
-
-        if doc_relevance_score.binary_score:
-            print("Document relevance check passed")
-            print("Checking question relevance...")
-            question_relevance_score = question_relevance.invoke({"question": question, "solution": solution})
-            
-            state["document_relevance_score"] = doc_relevance_score
-            state["question_relevance_score"] = question_relevance_score
-            
-            if question_relevance_score.binary_score:
-                print("ROUTING DECISION: Going to 'END' (Answers Question)")
-                return "Answers Question"
-            else:
-                print("ROUTING DECISION: Going to 'END' (Question not addressed)")
-                return "Question not addressed"
-        else:
+        if not state["document_relevance_score"].binary_score:
             print(f"ROUTING DECISION: Going to 'Generate Answer' (Hallucinations detected, retry {retry_count + 1})")
-            state["document_relevance_score"] = doc_relevance_score
-            return "Hallucinations detected"
\ No newline at end of file
+            return "Hallucinations detected"
+        
+        if state["question_relevance_score"].binary_score:
+            print("ROUTING DECISION: Going to 'END' (Answers Question)")
+            return "Answers Question"
+        
+        print("ROUTING DECISION: Going to 'END' (Question not addressed)")
+        return "Question not addressed"
@@ -0,0 +1,80 @@
+import math
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+from config import (
+    RERANKER, RERANK_CROSS_ENCODER_MODEL, EMBEDDING_MODEL, LOCAL_EMBEDDING_BATCH_SIZE, LOCAL_EMBEDDING_THREADS
+)
+from embeddings import get_embedding_function
+from resource_registry import get_shared_resource
+
+
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class EmbeddingReranker:
+    """Scores chunks by cosine similarity to the question using the index's embedding function.
+
+    Chunk vectors come from the embedding cache filled at indexing time, so only the question is embedded.
+    """
+
+    def __init__(self, embedding_function):
+        self.embedding_function = embedding_function
+
+    def score(self, question: str, documents: List[Document]) -> List[float]:
+        question_vector = self.embedding_function.embed_query(question)
+        document_vectors = self.embedding_function.embed_documents([document.page_content for document in documents])
+        return [cosine_similarity(question_vector, vector) for vector in document_vectors]
+
+
+class CrossEncoderReranker:
+    """Local sentence-transformers cross-encoder on CPU; logits are squashed to 0..1 so thresholds stay comparable."""
+
+    def __init__(self, model_name: str, batch_size: int = 32, num_threads: int = 1):
+        import torch
+        from sentence_transformers import CrossEncoder
+
+        torch.set_num_threads(num_threads)
+        self.batch_size = batch_size
+        self.model = CrossEncoder(model_name, device="cpu")
+
+    def score(self, question: str, documents: List[Document]) -> List[float]:
+        logits = self.model.predict(
+            [(question, document.page_content) for document in documents],
+            batch_size=self.batch_size, show_progress_bar=False
+        )
+        return [1.0 / (1.0 + math.exp(-float(logit))) for logit in logits]
+
+
+def rerank_documents(reranker, question: str, documents: List[Document], top_n: int) -> Tuple[List[Document], List[float]]:
+    """Orders documents by reranker score (stable for ties) and keeps the top_n with their scores."""
+    if not documents:
+        return [], []
+    scores = reranker.score(question, documents)
+    ranked = sorted(zip(documents, scores), key=lambda item: item[1], reverse=True)[:top_n]
+    return [document for document, _ in ranked], [score for _, score in ranked]
+
+
+def _create_reranker():
+    if RERANKER == "cross_encoder":
+        return CrossEncoderReranker(
+            RERANK_CROSS_ENCODER_MODEL, batch_size=LOCAL_EMBEDDING_BATCH_SIZE, num_threads=LOCAL_EMBEDDING_THREADS
+        )
+    if RERANKER != "embedding":
+        raise ValueError(f"Unknown reranker: {RERANKER}")
+    return EmbeddingReranker(get_embedding_function())
+
+
+def get_scorer_name() -> str:
+    """Identifies the model behind the rerank scores, so calibrated thresholds are never reused across scorers."""
+    if RERANKER == "cross_encoder":
+        return f"cross_encoder:{RERANK_CROSS_ENCODER_MODEL}"
+    return f"embedding:{EMBEDDING_MODEL}"
+
+
+def get_reranker():
+    return get_shared_resource("reranker", RERANKER, _create_reranker)
@@ -0,0 +1,60 @@
+import threading
+
+_registry_lock = threading.Lock()
+_key_locks = {}
+_resources = {}
+
+
+def _get_key_lock(key):
+    with _registry_lock:
+        if key not in _key_locks:
+            _key_locks[key] = threading.Lock()
+        return _key_locks[key]
+
+
+def get_shared_resource(kind, key, factory):
+    """Returns the process-wide resource for (kind, key), building it once with factory.
+
+    Factories that return None are not cached, so a failed build is retried by the next caller.
+    """
+    resource_key = (kind, key)
+    resource = _resources.get(resource_key)
+    if resource is not None:
+        return resource
+
+    with _get_key_lock(resource_key):
+        resource = _resources.get(resource_key)
+        if resource is None:
+            resource = factory()
+            if resource is not None:
+                _resources[resource_key] = resource
+                print(f"Registered shared {kind}: {key}")
+        return resource
+
+
+def set_shared_resource(kind, key, resource):
+    with _get_key_lock((kind, key)):
+        _resources[(kind, key)] = resource
+
+
+def get_shared_graph(name, factory):
+    return get_shared_resource("graph", name, factory)
+
+
+def get_shared_retriever(index_version, factory):
+    return get_shared_resource("retriever", index_version, factory)
+
+
+def set_shared_retriever(index_version, retriever):
+    set_shared_resource("retriever", index_version, retriever)
+
+
+def get_shared_embeddings(model, factory):
+    return get_shared_resource("embeddings", model, factory)
+
+
+def clear_shared_resources(kind=None):
+    with _registry_lock:
+        for resource_key in list(_resources):
+            if kind is None or resource_key[0] == kind:
+                del _resources[resource_key]
@@ -0,0 +1,52 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+
+from text_normalization import normalize_question
+
+
+class RetrievalCache:
+    """LRU cache of retrieved documents keyed by (index version, normalized question).
+
+    Repeated and trivially rephrased questions (case, accents, punctuation) skip both the query
+    embedding and the vector/BM25 search; a new index version never sees older entries.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, index_version: str, question: str) -> Optional[List[Document]]:
+        key = (index_version, normalize_question(question))
+        with self._lock:
+            documents = self._entries.get(key)
+            if documents is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        print(f"Retrieval cache: hit for '{question}' ({len(documents)} documents)")
+        return list(documents)
+
+    def put(self, index_version: str, question: str, documents: List[Document]):
+        key = (index_version, normalize_question(question))
+        with self._lock:
+            self._entries[key] = list(documents)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, index_version: Optional[str] = None):
+        with self._lock:
+            for key in list(self._entries):
+                if index_version is None or key[0] == index_version:
+                    del self._entries[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,102 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+
+def search_vector_store(vector_store, query: str, k: int, where: Optional[Dict[str, Any]] = None,
+                        search_type: str = "similarity", score_threshold: Optional[float] = None,
+                        fetch_k: int = 20, lambda_mult: float = 0.5) -> List[Tuple[Document, Optional[float]]]:
+    """Runs a Chroma search and returns (document, relevance score); MMR results carry no score."""
+    filter_kwargs = {"filter": where} if where else {}
+    if search_type == "mmr":
+        documents = vector_store.max_marginal_relevance_search(
+            query, k=k, fetch_k=max(fetch_k, k), lambda_mult=lambda_mult, **filter_kwargs
+        )
+        return [(document, None) for document in documents]
+
+    scored_documents = vector_store.similarity_search_with_relevance_scores(query, k=k, **filter_kwargs)
+    if search_type == "similarity_score_threshold" and score_threshold is not None:
+        scored_documents = [(document, score) for document, score in scored_documents if score >= score_threshold]
+    return scored_documents
+
+
+def trim_adaptive_k(scored_items: List[Tuple[Any, Optional[float]]], score_ratio: Optional[float],
+                    min_k: int = 1) -> List[Tuple[Any, Optional[float]]]:
+    """Drops the tail of a ranking whose score falls below score_ratio * best score (always keeping min_k)."""
+    if not score_ratio or not scored_items or scored_items[0][1] is None or scored_items[0][1] <= 0:
+        return scored_items
+    cutoff = scored_items[0][1] * score_ratio
+    return [item for position, item in enumerate(scored_items) if position < min_k or item[1] >= cutoff]
+
+
+class VectorRetriever(BaseRetriever):
+    """Chroma retriever with similarity, MMR or score-threshold search and optional adaptive k."""
+
+    vector_store: Any
+    k: int = 4
+    where: Optional[Dict[str, Any]] = None
+    search_type: str = "similarity"
+    score_threshold: Optional[float] = None
+    fetch_k: int = 20
+    lambda_mult: float = 0.5
+    adaptive_k_ratio: Optional[float] = None
+    min_k: int = 1
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        scored_documents = search_vector_store(
+            self.vector_store, query, self.k, where=self.where, search_type=self.search_type,
+            score_threshold=self.score_threshold, fetch_k=self.fetch_k, lambda_mult=self.lambda_mult
+        )
+        scored_documents = trim_adaptive_k(scored_documents, self.adaptive_k_ratio, self.min_k)
+        return [document for document, _ in scored_documents]
+
+
+class HybridRetriever(VectorRetriever):
+    """Fuses Chroma search with BM25 keyword search using reciprocal-rank fusion (RRF).
+
+    Each list contributes 1 / (rrf_k + rank) per chunk, so chunks found by both rankings rise to the top
+    and exact-term matches (ETP, ARM, Thornthwaite...) are recalled even when their embeddings are not close.
+    Score thresholds and adaptive k trim each ranking by its own scores before fusion.
+    """
+
+    bm25_index: Any
+    rrf_k: int = 60
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        vector_documents = search_vector_store(
+            self.vector_store, query, self.fetch_k, where=self.where, search_type=self.search_type,
+            score_threshold=self.score_threshold, fetch_k=2 * self.fetch_k, lambda_mult=self.lambda_mult
+        )
+        vector_documents = trim_adaptive_k(vector_documents, self.adaptive_k_ratio, self.min_k)
+        keyword_documents = self._fetch_keyword_documents(query)
+        return self._fuse([
+            [document for document, _ in vector_documents],
+            keyword_documents
+        ])[:self.k]
+
+    def _fetch_keyword_documents(self, query: str) -> List[Document]:
+        ranked = trim_adaptive_k(
+            self.bm25_index.search(query, self.fetch_k, where=self.where), self.adaptive_k_ratio, self.min_k
+        )
+        ranked_ids = [chunk_id for chunk_id, _ in ranked]
+        if not ranked_ids:
+            return []
+
+        results = self.vector_store.get(ids=ranked_ids, include=["documents", "metadatas"])
+        documents_by_id = {
+            chunk_id: Document(page_content=text, metadata=metadata or {})
+            for chunk_id, text, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+        }
+        return [documents_by_id[chunk_id] for chunk_id in ranked_ids if chunk_id in documents_by_id]
+
+    def _fuse(self, rankings: List[List[Document]]) -> List[Document]:
+        # Chunks are keyed by content: identical text in both rankings is the same chunk
+        fused_scores, documents = {}, {}
+        for ranking in rankings:
+            for rank, document in enumerate(ranking, start=1):
+                key = document.page_content
+                fused_scores[key] = fused_scores.get(key, 0.0) + 1.0 / (self.rrf_k + rank)
+                documents.setdefault(key, document)
+        return [documents[key] for key in sorted(fused_scores, key=fused_scores.get, reverse=True)]
@@ -5,6 +5,7 @@ class GraphState(TypedDict):
     solution: str
     online_search: bool
     documents: List[str]
+    rerank_scores: Optional[List[float]]
     search_method: Optional[str]
     document_evaluations: Optional[List[Dict[str, Any]]]
     document_relevance_score: Optional[Dict[str, Any]]
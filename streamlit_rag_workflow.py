@@ -0,0 +1,27 @@
+import streamlit as st
+
+from rag_workflow import RAGWorkflow
+
+
+class StreamlitRAGWorkflow(RAGWorkflow):
+    
+    def get_current_retriever(self):
+        session_retriever = st.session_state.get('retriever')
+        if session_retriever is not None:
+            print(f"Using retriever from session state for file: {st.session_state.get('processed_file')}")
+            return session_retriever
+        return self.retriever
+    
+    def get_current_index_version(self):
+        if st.session_state.get('retriever') is not None:
+            return st.session_state.get('index_version')
+        return self.index_version
+    
+    def _build_run_config(self):
+        config = super()._build_run_config()
+        config["configurable"]["on_retriever_error"] = self._clear_session_retriever
+        return config
+    
+    def _clear_session_retriever(self):
+        self.set_retriever(None)
+        st.session_state.retriever = None
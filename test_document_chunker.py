@@ -0,0 +1,65 @@
+from langchain_core.documents import Document
+
+from document_chunker import _classify_line, _find_blocks, split_document_by_structure
+
+BHC_TABLE = """Mês T P ETP ETR DEF EXC
+Jan 25,1 180,2 120,3 120,3 0,0 59,9
+Fev 25,3 160,4 110,2 110,2 0,0 50,2
+Mar 24,8 150,0 112,7 112,7 0,0 37,3
+Abr 23,0 90,5 95,1 94,0 1,1 0,0
+"""
+
+FORMULA_BLOCK = """ETP = 16 * (10 * T / I) ^ a
+I = Σ (T / 5) ^ 1,514
+a = 0,49 + 0,0179 * I
+"""
+
+PROSE = (
+    "O balanço hídrico de Thornthwaite e Mather (1955) compara a precipitação com a evapotranspiração.\n"
+    "Quando P = 1200 mm e a ETP anual fica em torno de 1100 mm, o excedente hídrico é positivo.\n"
+    "Em 2020 a estação registrou 35 dias sem chuva entre julho e agosto.\n"
+)
+
+
+def test_bhc_table_header_and_month_rows_are_one_table_block():
+    assert [_classify_line(line) for line in BHC_TABLE.splitlines()] == ["table"] * 5
+    
+    blocks = _find_blocks(BHC_TABLE)
+    assert [block_type for block_type, _, _ in blocks] == ["table"]
+    
+    chunks = split_document_by_structure(Document(page_content=BHC_TABLE, metadata={"page": 3}))
+    assert len(chunks) == 1
+    assert chunks[0].metadata["chunk_type"] == "table"
+    assert chunks[0].metadata["page"] == 3
+    assert chunks[0].page_content.startswith("[Tabela: 5 linhas; colunas: Mês, T, P, ETP, ETR, DEF, EXC]")
+    assert "Abr 23,0 90,5 95,1 94,0 1,1 0,0" in chunks[0].page_content
+
+
+def test_multiline_formula_is_one_equation_block():
+    blocks = _find_blocks(FORMULA_BLOCK)
+    assert [block_type for block_type, _, _ in blocks] == ["equation"]
+    
+    chunks = split_document_by_structure(Document(page_content=FORMULA_BLOCK, metadata={}))
+    assert [chunk.metadata["chunk_type"] for chunk in chunks] == ["equation"]
+    assert chunks[0].page_content.startswith("[Equação: define ETP, I, a]")
+
+
+def test_prose_with_equals_and_numbers_stays_text():
+    assert [_classify_line(line) for line in PROSE.splitlines()] == ["text"] * 3
+    assert [block_type for block_type, _, _ in _find_blocks(PROSE)] == ["text"]
+
+
+def test_single_formula_line_stays_in_its_paragraph():
+    text = "A evapotranspiração potencial é corrigida pelo fotoperíodo:\nETPc = ETP * K\nonde K depende da latitude.\n"
+    assert _classify_line("ETPc = ETP * K") == "equation"
+    assert [block_type for block_type, _, _ in _find_blocks(text)] == ["text"]
+
+
+def test_table_between_paragraphs_keeps_its_offsets():
+    text = PROSE + "\n" + BHC_TABLE + "\n" + PROSE
+    blocks = _find_blocks(text)
+    assert [block_type for block_type, _, _ in blocks] == ["text", "table", "text"]
+    
+    _, start_index, table_text = blocks[1]
+    assert text[start_index:start_index + len(table_text)] == table_text
+    assert table_text.strip() == BHC_TABLE.strip()
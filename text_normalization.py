@@ -0,0 +1,57 @@
+import re
+import unicodedata
+
+BHC_COLUMNS = {"P", "ETP", "ETR", "ARM", "ALT", "DEF", "EXC", "NEG-AC", "P-ETP", "NEGAC", "T", "I", "K"}
+MONTHS = {"jan", "fev", "mar", "abr", "mai", "jun", "jul", "ago", "set", "out", "nov", "dez", "total", "média", "media"}
+
+_MONTH_NAMES = {
+    "janeiro", "fevereiro", "março", "abril", "maio", "junho",
+    "julho", "agosto", "setembro", "outubro", "novembro", "dezembro"
+}
+
+
+_MINUS_SIGNS = str.maketrans({"−": "-", "–": "-"})
+# Signed and decimal numbers stay whole ("-10", "10,5") so "P-ETP = -10" and "P-ETP = 10" keep different keys
+_TOKEN_PATTERN = re.compile(r"(?<!\w)-?\d+(?:[.,]\d+)*(?!\w)|\w+")
+_NUMBER_PATTERN = re.compile(r"^-?\d+(?:[.,]\d+)*$")
+
+
+def normalize_question(question: str) -> str:
+    normalized = unicodedata.normalize("NFKD", question.casefold().translate(_MINUS_SIGNS))
+    normalized = "".join(char for char in normalized if not unicodedata.combining(char))
+    return " ".join(_TOKEN_PATTERN.findall(normalized))
+
+
+# Acronyms and spelled-out forms of the same BHC variable map to one term, so "Déficit (DEF)" matches "DEF"
+_CANONICAL_PHRASES = {
+    "evapotranspiracao potencial": "etp",
+    "evapotranspiracao real": "etr",
+    "alteracao do armazenamento": "alt",
+    "negativo acumulado": "negac",
+    "neg ac": "negac",
+    "p menos etp": "petp",
+    "p etp": "petp",
+    "indice de umidade": "iu",
+    "indice de aridez": "ia",
+    "indice hidrico": "ih",
+}
+_CANONICAL_TERMS = {
+    **{column.lower(): column.lower() for column in BHC_COLUMNS if "-" not in column},
+    "petp": "petp", "potencial": "etp", "real": "etr", "deficit": "def", "excedente": "exc", "armazenamento": "arm",
+    "precipitacao": "p", "temperatura": "t", "umidade": "iu", "aridez": "ia", "iu": "iu", "ia": "ia", "ih": "ih",
+    **{normalize_question(month): normalize_question(month) for month in MONTHS},
+    **{normalize_question(name): normalize_question(name)[:3] for name in _MONTH_NAMES},
+}
+_PHRASE_PATTERN = re.compile(
+    r"(?<!\S)(" + "|".join(re.escape(phrase) for phrase in sorted(_CANONICAL_PHRASES, key=len, reverse=True)) + r")(?!\S)"
+)
+
+
+def get_salient_terms(normalized_question: str) -> frozenset:
+    """Numbers, months and BHC variables: embeddings barely move when only these change, but the answer does."""
+    text = _PHRASE_PATTERN.sub(lambda match: _CANONICAL_PHRASES[match.group(1)], normalized_question)
+    return frozenset(
+        token if _NUMBER_PATTERN.match(token) else _CANONICAL_TERMS[token]
+        for token in text.split()
+        if _NUMBER_PATTERN.match(token) or token in _CANONICAL_TERMS
+    )
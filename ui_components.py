@@ -95,6 +95,22 @@ def render_file_analysis(file_info):
         st.write(f"{status_icon} {status_text}")
 
 
+def render_corpus_filters(corpus_files):
+    with st.sidebar:
+        st.markdown("### 📚 Corpus de Documentos")
+        st.caption(f"{len(corpus_files)} arquivos indexados")
+        file_names = st.multiselect(
+            "Filtrar por arquivo",
+            sorted({corpus_file["file_name"] for corpus_file in corpus_files if corpus_file["file_name"]}),
+            help="Sem seleção, a busca considera todo o corpus."
+        )
+        file_types = st.multiselect(
+            "Filtrar por tipo",
+            sorted({corpus_file["file_type"] for corpus_file in corpus_files if corpus_file["file_type"]})
+        )
+    return file_names, file_types
+
+
 def render_upload_placeholder():
     st.markdown(f"""
     <div style="text-align: center; padding: 3rem; background: #f8fafc; border-radius: 10px; margin: 2rem 0;">
@@ -114,6 +130,8 @@ def render_question_section(user_file):
         # For local files, get the path from session state
         local_file_path = st.session_state.get('processed_file', 'local_data/geografo_proposta.pdf')
         file_display = f"📄 **Documento Atual:** {os.path.basename(local_file_path)} (arquivo local)"
+    elif user_file == "corpus":
+        file_display = f"📚 **Corpus Atual:** {st.session_state.get('corpus_scope', 'todos os documentos')}"
     elif hasattr(user_file, 'name'):
         # For uploaded files
         file_display = f"📄 **Documento Atual:** {user_file.name}"
@@ -160,11 +178,11 @@ def render_evaluation_section_content(user_file):
     # Import evaluation components (conditional import to avoid errors if packages not installed)
     try:
         from evaluation import render_evaluation_section
-        from rag_workflow import RAGWorkflow
+        from streamlit_rag_workflow import StreamlitRAGWorkflow
         
         # Get RAG workflow instance
         if 'rag_workflow' not in st.session_state:
-            st.session_state.rag_workflow = RAGWorkflow()
+            st.session_state.rag_workflow = StreamlitRAGWorkflow()
         
         rag_workflow = st.session_state.rag_workflow
         
@@ -172,7 +190,8 @@ def render_evaluation_section_content(user_file):
         def rag_system_func(question):
             """Wrapper function for RAG system to use in evaluation"""
             try:
-                return rag_workflow.process_question(question)
+                # Bypass the answer cache so RAGAS/Giskard score the pipeline, not earlier cached answers
+                return rag_workflow.process_question(question, use_answer_cache=False)
             except Exception as e:
                 st.error(f"Erro no sistema RAG: {str(e)}")
                 return {"solution": "Erro na geração da resposta", "documents": []}
@@ -225,3 +244,72 @@ def render_answer_section(result):
     st.markdown("### 📝 Resposta")
     st.success(result['solution'])
     st.markdown("---")
+
+
+def render_streaming_answer_section(events):
+    """Renders answer tokens as they stream in and appends validation verdicts; returns the final state"""
+    st.markdown("### 📝 Resposta")
+    status_placeholder = st.empty()
+    answer_placeholder = st.empty()
+    verdict_placeholder = st.empty()
+    
+    status_placeholder.info("🧠 Analisando sua pergunta e recuperando informações relevantes...")
+    
+    streamed_answer = ""
+    new_attempt = True
+    result = None
+    
+    for event_type, payload in events:
+        if event_type == "token":
+            if new_attempt:
+                streamed_answer = ""
+                new_attempt = False
+            streamed_answer += payload
+            answer_placeholder.success(streamed_answer + "▌")
+        elif event_type == "node":
+            node_name, update = payload
+            if node_name == "Retrieve Documents":
+                status_placeholder.info("🔢 Reordenando os documentos recuperados...")
+            elif node_name == "Rerank Documents":
+                status_placeholder.info("📋 Avaliando a relevância dos documentos recuperados...")
+            elif node_name == "Grade Documents":
+                status_placeholder.info("✍️ Gerando resposta...")
+            elif node_name == "Generate Answer":
+                answer_placeholder.success(update.get("solution", streamed_answer))
+                status_placeholder.info("🎯 Validando resposta...")
+                new_attempt = True
+            elif node_name == "Validate Answer":
+                verdicts = _format_validation_verdicts(update)
+                if verdicts:
+                    verdict_placeholder.markdown(verdicts)
+        elif event_type == "result":
+            result = payload
+    
+    status_placeholder.empty()
+    if result:
+        answer_placeholder.success(result['solution'])
+    st.markdown("---")
+    return result
+
+
+def _format_validation_verdicts(update):
+    verdicts = []
+    
+    doc_relevance = update.get('document_relevance_score')
+    if doc_relevance is not None:
+        if doc_relevance.binary_score:
+            verdicts.append("✅ Resposta fundamentada nos documentos")
+        else:
+            verdicts.append("❌ Resposta não fundamentada - gerando nova resposta")
+    
+    q_relevance = update.get('question_relevance_score')
+    if q_relevance is not None:
+        if q_relevance.binary_score:
+            verdicts.append("✅ Resposta corresponde à pergunta")
+        else:
+            verdicts.append("❌ Resposta não corresponde totalmente à pergunta")
+    
+    if update.get('retry_limit_reached'):
+        verdicts.append("⚠️ Limite de tentativas atingido")
+    
+    return "  \n".join(verdicts)
@@ -15,10 +15,6 @@ def initialize_session_state():
         st.session_state.processed_file = None
     if 'retriever' not in st.session_state:
         st.session_state.retriever = None
-    if 'graph_instance' not in st.session_state:
-        st.session_state.graph_instance = None
-    if 'db_cleared' not in st.session_state:
-        st.session_state.db_cleared = False
 
 
 def get_file_key(uploaded_file):